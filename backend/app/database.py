@@ -1,18 +1,85 @@
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import settings
 
+
+def json_serializer(value) -> str:
+    """Encode JSON columns with orjson (JSON columns bind str values)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped reads
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply read-friendly pragmas; most are per-connection, so run on each connect"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+# Indexes removed from the models, dropped from databases created while they existed
+DROPPED_INDEXES = (
+    "ix_jobs_type_status",  # Superseded by the partial unique ix_jobs_one_active
+)
+
+
+def create_indexes(bind=engine):
+    """Create model indexes missing from an existing database.
+
+    create_all() skips tables that already exist, so indexes added to the
+    models later would otherwise never reach a database created earlier.
+    Indexes listed in DROPPED_INDEXES are removed for the same reason.
+    """
+    with bind.begin() as connection:
+        for name in DROPPED_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def add_missing_columns(bind=engine):
+    """Add nullable model columns missing from an existing database.
+
+    Like create_indexes, this covers what create_all() skips for tables that
+    already exist. Only nullable columns without a server default are added,
+    since those need no backfill.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable or column.server_default is not None:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -6,68 +6,212 @@ Provides dual-format logging:
 2. Machine-parseable JSON for automation (Claude Code compatible)
 """
 
-import json
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
-# Standard error codes for automated detection
-ERROR_CODES = {
-    "SEC_RATE_LIMIT": {
-        "description": "SEC API rate limit exceeded",
-        "recoverable": True,
-        "suggested_fix": "Wait 60 seconds and retry"
-    },
-    "SEC_FILING_NOT_FOUND": {
-        "description": "No 10-K filing found for ticker",
-        "recoverable": True,
-        "suggested_fix": "Skip company and continue with next"
-    },
-    "SEC_PARSE_ERROR": {
-        "description": "Failed to parse SEC filing",
-        "recoverable": True,
-        "suggested_fix": "Check edgartools version or skip filing"
-    },
-    "SEC_CONNECTION_ERROR": {
-        "description": "Failed to connect to SEC EDGAR",
-        "recoverable": True,
-        "suggested_fix": "Check network connection and retry"
-    },
-    "GEMINI_API_ERROR": {
-        "description": "Gemini API returned error",
-        "recoverable": True,
-        "suggested_fix": "Check API key validity and quota"
-    },
-    "GEMINI_RATE_LIMIT": {
-        "description": "Gemini API rate limit exceeded",
-        "recoverable": True,
-        "suggested_fix": "Implement exponential backoff and retry"
-    },
-    "GEMINI_PARSE_ERROR": {
-        "description": "Failed to parse Gemini JSON response",
-        "recoverable": True,
-        "suggested_fix": "Retry with stricter prompt or adjust parsing"
-    },
-    "DB_CONNECTION_ERROR": {
-        "description": "Database connection failed",
-        "recoverable": False,
-        "suggested_fix": "Check DATABASE_URL and file permissions"
-    },
-    "DB_INTEGRITY_ERROR": {
-        "description": "Database constraint violation",
-        "recoverable": True,
-        "suggested_fix": "Check for duplicate data before insert"
-    },
-    "ANALYSIS_INCOMPLETE": {
-        "description": "Analysis missing required fields",
-        "recoverable": True,
-        "suggested_fix": "Re-run Gemini analysis for this filing"
-    },
+import orjson
+
+# Standard error codes for automated detection: code -> (recoverable, suggested_fix)
+ERROR_CODES: dict[str, tuple[bool, str]] = {
+    "SEC_RATE_LIMIT": (True, "Wait 60 seconds and retry"),
+    "SEC_FILING_NOT_FOUND": (True, "Skip company and continue with next"),
+    "SEC_PARSE_ERROR": (True, "Check edgartools version or skip filing"),
+    "SEC_CONNECTION_ERROR": (True, "Check network connection and retry"),
+    "GEMINI_API_ERROR": (True, "Check API key validity and quota"),
+    "GEMINI_RATE_LIMIT": (True, "Implement exponential backoff and retry"),
+    "GEMINI_PARSE_ERROR": (True, "Retry with stricter prompt or adjust parsing"),
+    "DB_CONNECTION_ERROR": (False, "Check DATABASE_URL and file permissions"),
+    "DB_INTEGRITY_ERROR": (True, "Check for duplicate data before insert"),
+    "ANALYSIS_INCOMPLETE": (True, "Re-run Gemini analysis for this filing"),
+}
+
+# Human-readable descriptions of the error codes, for docs and UI
+ERROR_DESCRIPTIONS: dict[str, str] = {
+    "SEC_RATE_LIMIT": "SEC API rate limit exceeded",
+    "SEC_FILING_NOT_FOUND": "No 10-K filing found for ticker",
+    "SEC_PARSE_ERROR": "Failed to parse SEC filing",
+    "SEC_CONNECTION_ERROR": "Failed to connect to SEC EDGAR",
+    "GEMINI_API_ERROR": "Gemini API returned error",
+    "GEMINI_RATE_LIMIT": "Gemini API rate limit exceeded",
+    "GEMINI_PARSE_ERROR": "Failed to parse Gemini JSON response",
+    "DB_CONNECTION_ERROR": "Database connection failed",
+    "DB_INTEGRITY_ERROR": "Database constraint violation",
+    "ANALYSIS_INCOMPLETE": "Analysis missing required fields",
 }
 
 
+def _level_from_env(var: str, default: int) -> int:
+    """Read a logging level name (e.g. "INFO") from the environment."""
+    level = logging.getLevelName(os.environ.get(var, "").upper())
+    return level if isinstance(level, int) else default
+
+
+# Minimum levels for the Python logger and the structured JSONL file
+LOG_LEVEL = _level_from_env("LOG_LEVEL", logging.DEBUG)
+LOG_JSON_LEVEL = _level_from_env("LOG_JSON_LEVEL", logging.DEBUG)
+
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS" prefix) for the last timestamp
+_timestamp_cache = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp with microseconds, reusing the per-second prefix."""
+    global _timestamp_cache
+    ns = time.time_ns()
+    sec = ns // 1_000_000_000
+    cached_sec, prefix = _timestamp_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _timestamp_cache = (sec, prefix)
+    return f"{prefix}.{(ns // 1000) % 1_000_000:06d}Z"
+
+
+_STOP = object()  # Sentinel telling the writer thread to exit
+
+
+class _LogWriter:
+    """
+    Background JSONL writer shared by every logger writing to the same file.
+
+    Log calls only enqueue the entry; a daemon thread keeps the file open,
+    encodes entries in batches and appends each batch with a single write.
+    """
+
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 0.05  # seconds
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._file = None
+        # Guards _closed, so no entry can be queued behind the stop sentinel
+        self._state_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._drain, name="structured-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, entry: dict):
+        """Queue an entry for writing (written inline once the writer is closed)."""
+        with self._state_lock:
+            if not self._closed:
+                self._queue.put(entry)
+                return
+        self._write([entry])
+
+    def _drain(self):
+        """Collect up to BATCH_SIZE entries or FLUSH_INTERVAL worth, then write."""
+        while True:
+            entries = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(entries) < self.BATCH_SIZE and entries[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entries.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if entries[-1] is _STOP:
+                self._write(entries[:-1])
+                return
+            self._write(entries)
+
+    def _write(self, entries: list):
+        """Encode a batch of entries and append it with one write call."""
+        if not entries:
+            return
+        try:
+            buf = b"".join(
+                orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE)
+                for entry in entries
+            )
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self.path, "ab", buffering=0)
+                self._file.write(buf)
+        except Exception as e:
+            print(f"Failed to write structured log: {e}", file=sys.stderr)
+
+    def close(self):
+        """Drain the queue and stop the writer thread (called at interpreter exit)."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+
+_writers: dict[Path, _LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(path: Path) -> _LogWriter:
+    """Return the shared writer for a JSONL path, starting it on first use."""
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            # The log directory is created once, with its first writer
+            path.parent.mkdir(exist_ok=True)
+            writer = _writers[path] = _LogWriter(path)
+        return writer
+
+
+_queue_handlers: dict[Path, logging.handlers.QueueHandler] = {}
+_queue_handlers_lock = threading.Lock()
+
+
+def _get_queue_handler(log_dir: Path) -> logging.handlers.QueueHandler:
+    """
+    Return the shared queue handler for a log directory.
+
+    Loggers only enqueue records; one QueueListener thread per directory
+    formats them to the console and app.log, so the file is opened once
+    and request threads never block on console or disk writes.
+    """
+    with _queue_handlers_lock:
+        handler = _queue_handlers.get(log_dir)
+        if handler is None:
+            formatter = logging.Formatter(
+                '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+
+            # Console handler (human readable)
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(formatter)
+
+            # File handler (human readable)
+            file_handler = logging.FileHandler(log_dir / "app.log")
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(
+                log_queue, console_handler, file_handler, respect_handler_level=True
+            )
+            listener.start()
+            atexit.register(listener.stop)
+
+            handler = _queue_handlers[log_dir] = logging.handlers.QueueHandler(log_queue)
+        return handler
+
+
 class StructuredLogger:
     """
     Dual-format logger: human readable + JSON for automation.
@@ -81,34 +225,27 @@ class StructuredLogger:
     def __init__(self, name: str, log_dir: str = "logs"):
         self.component = name
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+        self._writer = _get_writer(self.log_dir / "structured.jsonl")
+        self._json_level = LOG_JSON_LEVEL
 
         # Set up Python logger
         self.logger = logging.getLogger(name)
         if not self.logger.handlers:
-            self.logger.setLevel(logging.DEBUG)
-
-            # Console handler (human readable)
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setLevel(logging.INFO)
-            console_format = logging.Formatter(
-                '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            console_handler.setFormatter(console_format)
-            self.logger.addHandler(console_handler)
+            self.logger.setLevel(LOG_LEVEL)
+            self.logger.addHandler(_get_queue_handler(self.log_dir))
 
-            # File handler (human readable)
-            file_handler = logging.FileHandler(self.log_dir / "app.log")
-            file_handler.setLevel(logging.DEBUG)
-            file_handler.setFormatter(console_format)
-            self.logger.addHandler(file_handler)
+        # Level name -> (numeric level, bound logger method)
+        self._level_map = {
+            "DEBUG": (logging.DEBUG, self.logger.debug),
+            "INFO": (logging.INFO, self.logger.info),
+            "WARNING": (logging.WARNING, self.logger.warning),
+            "ERROR": (logging.ERROR, self.logger.error),
+            "CRITICAL": (logging.CRITICAL, self.logger.critical),
+        }
 
     def _write_json_log(self, entry: dict):
-        """Append JSON log entry to structured log file."""
-        json_path = self.log_dir / "structured.jsonl"
-        with open(json_path, "a") as f:
-            f.write(json.dumps(entry, default=str) + "\n")
+        """Queue JSON log entry for the background structured log writer."""
+        self._writer.put(entry)
 
     def _create_log_entry(
         self,
@@ -118,26 +255,21 @@ class StructuredLogger:
         **context
     ) -> dict:
         """Create structured log entry."""
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        timestamp = _utc_timestamp()
 
         entry = {
             "timestamp": timestamp,
             "level": level,
             "component": self.component,
             "message": message,
-            "context": context if context else None,
         }
+        if context:
+            entry["context"] = context
 
         # Add error metadata if error_code provided
-        if error_code and error_code in ERROR_CODES:
-            error_info = ERROR_CODES[error_code]
+        if error_code:
             entry["error_code"] = error_code
-            entry["recoverable"] = error_info["recoverable"]
-            entry["suggested_fix"] = error_info["suggested_fix"]
-        elif error_code:
-            entry["error_code"] = error_code
-            entry["recoverable"] = True
-            entry["suggested_fix"] = None
+            entry["recoverable"], entry["suggested_fix"] = ERROR_CODES.get(error_code, (True, None))
 
         return entry
 
@@ -149,20 +281,26 @@ class StructuredLogger:
         **context
     ):
         """Internal logging method."""
-        entry = self._create_log_entry(level, message, error_code, **context)
-
-        # Human-readable log message
-        human_msg = message
-        if context:
-            context_str = " | ".join(f"{k}={v}" for k, v in context.items())
-            human_msg = f"{message} | {context_str}"
+        # Skip building anything when neither output wants this level
+        numeric_level, log_method = self._level_map[level]
+        write_json = numeric_level >= self._json_level
+        write_human = self.logger.isEnabledFor(numeric_level)
+        if not write_json and not write_human:
+            return None
 
-        # Log to Python logger
-        log_method = getattr(self.logger, level.lower())
-        log_method(human_msg)
+        # Human-readable log message, only formatted when it will be emitted
+        if write_human:
+            human_msg = message
+            if context:
+                context_str = " | ".join(f"{k}={v}" for k, v in context.items())
+                human_msg = f"{message} | {context_str}"
+            log_method(human_msg)
 
         # Write JSON log
-        self._write_json_log(entry)
+        entry = None
+        if write_json:
+            entry = self._create_log_entry(level, message, error_code, **context)
+            self._write_json_log(entry)
 
         return entry
 
@@ -196,8 +334,9 @@ class StructuredLogger:
         return self._log("CRITICAL", message, error_code, **context)
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> StructuredLogger:
-    """Factory function to get a structured logger."""
+    """Factory function to get a structured logger (one instance per name)."""
     return StructuredLogger(name)
 
 
@@ -1,24 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
-from app.database import engine, Base
+from app.database import engine, Base, add_missing_columns, create_indexes
 from app.routers import companies, filings, jobs
+from app.services.job_worker import job_worker
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create database tables
+    # Startup: Create database tables and any columns and indexes they are missing
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # Jobs run in-process, so any still pending or running whose server process is
+    # gone will never finish. Clear them before the indexes, since
+    # ix_jobs_one_active rejects duplicates.
+    jobs.fail_interrupted_jobs()
+    create_indexes(engine)
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop the job worker threads
+    job_worker.shutdown()
 
 
 app = FastAPI(
     title="Stock Analysis API",
     description="SEC 10-K analyzer for S&P 100 companies",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Float, JSON, Index, text
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -18,6 +18,15 @@ class Company(Base):
     # Relationships
     filings = relationship("Filing", back_populates="company")
 
+    __table_args__ = (
+        Index("ix_companies_sector", "sector"),
+    )
+
+    @validates("ticker")
+    def _normalize_ticker(self, key, ticker):
+        """Store tickers uppercased, so case-insensitive lookups stay plain ticker index seeks"""
+        return ticker.upper() if ticker else ticker
+
 
 class Filing(Base):
     __tablename__ = "filings"
@@ -29,7 +38,7 @@ class Filing(Base):
     fiscal_year = Column(Integer)
     accession_number = Column(String(50), unique=True)
     filing_url = Column(Text)
-    raw_content = Column(Text)  # Store extracted text
+    raw_content = Column(JSON)  # Extracted sections, stored as JSON
     status = Column(String(20), default="pending")  # pending, processing, completed, error
     created_at = Column(DateTime, server_default=func.now())
 
@@ -38,6 +47,14 @@ class Filing(Base):
     analysis_result = relationship("AnalysisResult", back_populates="filing", uselist=False)
     risk_assessments = relationship("RiskAssessment", back_populates="filing")
 
+    __table_args__ = (
+        Index("ix_filings_company_date", "company_id", "filing_date"),
+        Index("ix_filings_company_type_date", "company_id", "filing_type", "filing_date"),
+        Index("ix_filings_status", "status"),
+        # Latest completed filing per company: seek on (company, status), read newest first
+        Index("ix_filings_company_status_date", "company_id", "status", filing_date.desc()),
+    )
+
 
 class AnalysisResult(Base):
     __tablename__ = "analysis_results"
@@ -47,7 +64,7 @@ class AnalysisResult(Base):
     summary = Column(Text)  # Gemini-generated summary
     risk_factors_text = Column(Text)  # Extracted Item 1A
     mda_text = Column(Text)  # Extracted Item 7
-    analysis_json = Column(Text)  # Full JSON analysis from Gemini
+    analysis_json = Column(JSON)  # Full JSON analysis from Gemini
     created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
@@ -63,12 +80,16 @@ class RiskAssessment(Base):
     severity = Column(String(20), nullable=False)  # high, medium, low
     score = Column(Integer)  # 1-10
     description = Column(Text)
-    key_risks = Column(Text)  # JSON array of specific risks
+    key_risks = Column(JSON)  # JSON array of specific risks
     created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     filing = relationship("Filing", back_populates="risk_assessments")
 
+    __table_args__ = (
+        Index("ix_risk_assessments_filing_id", "filing_id"),
+    )
+
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -82,3 +103,27 @@ class Job(Base):
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     created_at = Column(DateTime, server_default=func.now())
+    worker_id = Column(String(64))  # host:pid of the server process that runs the job
+
+    __table_args__ = (
+        # Matches the newest-first order of job status and history reads, so they stop sorting
+        Index("ix_jobs_created", created_at.desc(), id.desc()),
+        # At most one pending or running job per type, enforced by the database so
+        # two requests starting the same job at once cannot both insert one
+        Index(
+            "ix_jobs_one_active",
+            "job_type",
+            unique=True,
+            sqlite_where=text("status IN ('pending', 'running')"),
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    input_hash = Column(String(64), primary_key=True)  # SHA-256 of prompt version + input
+    response_json = Column(JSON, nullable=False)  # Parsed Gemini analysis
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
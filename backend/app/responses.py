@@ -0,0 +1,58 @@
+"""
+Response helpers shared by the API routers.
+"""
+
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched from the database per streamed chunk
+STREAM_BATCH_SIZE = 200
+
+
+def ndjson_response(
+    db: Session,
+    stmt: Any,
+    encode_rows: Callable[[Sequence[Any]], Iterable[bytes]],
+) -> StreamingResponse:
+    """
+    Stream the rows of a select statement as newline-delimited JSON.
+
+    Rows are fetched STREAM_BATCH_SIZE at a time and handed to encode_rows,
+    which returns one newline-terminated JSON line per row, so memory stays
+    bounded by the batch size rather than the result size. The session is
+    closed once the stream ends, since request dependencies may already have
+    exited by then.
+    """
+    def generate() -> Iterator[bytes]:
+        try:
+            result = db.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for rows in result.partitions():
+                yield b"".join(encode_rows(rows))
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def cache_control(max_age: int, stale_while_revalidate: Optional[int] = None) -> Callable[[Response], None]:
+    """
+    Build a route dependency that marks responses as publicly cacheable.
+
+    The header is set on the response FastAPI renders from the handler's return
+    value; handlers that return a Response of their own, such as NDJSON streams,
+    are left uncached.
+    """
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate is not None:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+
+    def set_headers(response: Response) -> None:
+        response.headers["Cache-Control"] = value
+        response.headers["Vary"] = "Origin"
+
+    return set_headers
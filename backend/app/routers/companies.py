@@ -1,108 +1,191 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import base64
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
+from sqlalchemy import event, func, select, tuple_
+from sqlalchemy.orm import Session, raiseload, selectinload
 from typing import List, Optional
 
 from app.database import get_db
-from app.models import Company, Filing, RiskAssessment, AnalysisResult
+from app.models import Company, Filing, AnalysisResult
+from app.responses import cache_control, ndjson_response
 from app.schemas import CompanyResponse, CompanyDetailResponse, CompanyListResponse, RiskScores, FilingResponse
 from app.services.risk_calculator import RiskCalculator
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 risk_calculator = RiskCalculator()
 
+# One compiled validator for a whole page of companies
+_COMPANY_LIST = TypeAdapter(List[CompanyResponse])
 
-@router.get("", response_model=CompanyListResponse)
+# Company totals by sector filter, dropped whenever a company is written
+_count_cache: TTLCache = TTLCache(maxsize=64, ttl=30)
+
+# Distinct sectors only change when companies are ingested
+_sectors_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
+
+
+@event.listens_for(Company, "after_insert")
+@event.listens_for(Company, "after_update")
+@event.listens_for(Company, "after_delete")
+def _invalidate_company_caches(mapper, connection, target):
+    """Drop the cached totals and sector list when a company is added, changed or removed"""
+    _count_cache.clear()
+    _sectors_cache.clear()
+
+
+def _encode_cursor(row) -> str:
+    """Encode the sort key of the last company on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(orjson.dumps([row.ticker, row.id])).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor back into the (ticker, id) sort key it was built from"""
+    try:
+        ticker, company_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(ticker, str) or not isinstance(company_id, int):
+            raise ValueError(cursor)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ticker, company_id
+
+
+def _company_responses(db: Session, rows) -> List[CompanyResponse]:
+    """Attach latest filing dates and risk scores to a batch of company rows"""
+    # Latest filing dates and risk scores for the whole batch in bulk
+    company_ids = [row.id for row in rows]
+    latest_filing_dates = dict(
+        db.query(Filing.company_id, func.max(Filing.filing_date))
+        .filter(Filing.company_id.in_(company_ids))
+        .group_by(Filing.company_id)
+        .all()
+    ) if company_ids else {}
+    risk_scores_by_company = risk_calculator.get_company_risk_scores_bulk(db, company_ids)
+
+    return _COMPANY_LIST.validate_python([
+        {
+            **row._mapping,
+            "latest_filing_date": latest_filing_dates.get(row.id),
+            "risk_scores": risk_scores_by_company.get(row.id),
+        }
+        for row in rows
+    ])
+
+
+@router.get("", response_model=CompanyListResponse, dependencies=[Depends(cache_control(300, 3600))])
 async def list_companies(
-    skip: int = 0,
+    skip: int = Query(0, deprecated=True),
     limit: int = 100,
     sector: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip_count: bool = False,
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """List all companies with their latest risk scores"""
-    query = db.query(Company)
+    """List all companies with their latest risk scores, ordered by ticker.
+
+    Pages are fetched by passing the previous page's next_cursor, which seeks on
+    the ticker index instead of scanning past skipped rows; skip still works but
+    is deprecated. With skip_count=1 the total is omitted and not counted. With
+    stream=1 the companies are returned as NDJSON, one per line, without a total.
+    """
+    # Plain column rows: the list view never needs ORM instances
+    stmt = select(
+        Company.id, Company.ticker, Company.name, Company.cik, Company.sector, Company.created_at
+    )
 
     if sector:
-        query = query.filter(Company.sector == sector)
-
-    total = query.count()
-    companies = query.offset(skip).limit(limit).all()
-
-    result = []
-    for company in companies:
-        # Get latest filing date
-        latest_filing = (
-            db.query(Filing)
-            .filter(Filing.company_id == company.id)
-            .order_by(Filing.filing_date.desc())
-            .first()
-        )
-
-        # Get risk scores
-        risk_scores = risk_calculator.get_company_risk_scores(db, company.id)
-
-        company_data = CompanyResponse(
-            id=company.id,
-            ticker=company.ticker,
-            name=company.name,
-            cik=company.cik,
-            sector=company.sector,
-            created_at=company.created_at,
-            latest_filing_date=latest_filing.filing_date if latest_filing else None,
-            risk_scores=RiskScores(**risk_scores) if risk_scores else None
+        stmt = stmt.where(Company.sector == sector)
+
+    # Tickers are not unique, so id breaks ties in the sort key
+    page = stmt.order_by(Company.ticker, Company.id)
+    if cursor:
+        page = page.where(tuple_(Company.ticker, Company.id) > _decode_cursor(cursor))
+    page = page.offset(skip)
+
+    if stream:
+        return ndjson_response(
+            db,
+            page.limit(limit),
+            lambda rows: (
+                orjson.dumps(c.model_dump(), option=orjson.OPT_APPEND_NEWLINE)
+                for c in _company_responses(db, rows)
+            ),
         )
-        result.append(company_data)
 
-    return CompanyListResponse(companies=result, total=total)
+    total = None
+    if not skip_count:
+        total = _count_cache.get((sector,))
+        if total is None:
+            total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+            _count_cache[(sector,)] = total
+
+    # One extra row tells whether another page follows
+    rows = db.execute(page.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    next_cursor = _encode_cursor(rows[limit - 1]) if has_more and limit > 0 else None
+
+    return CompanyListResponse(
+        companies=_company_responses(db, rows[:limit]),
+        total=total,
+        has_more=has_more,
+        next_cursor=next_cursor
+    )
 
 
-@router.get("/{ticker}", response_model=CompanyDetailResponse)
+@router.get("/{ticker}", response_model=CompanyDetailResponse, dependencies=[Depends(cache_control(600))])
 async def get_company(ticker: str, db: Session = Depends(get_db)):
     """Get detailed company information including filings and analysis"""
-    company = db.query(Company).filter(Company.ticker == ticker.upper()).first()
+    company = (
+        db.query(Company)
+        .options(
+            selectinload(Company.filings).selectinload(Filing.analysis_result),
+            selectinload(Company.filings).selectinload(Filing.risk_assessments),
+            # Everything the response needs is loaded above; fail loudly on lazy loads
+            selectinload(Company.filings).raiseload("*"),
+            raiseload("*"),
+        )
+        # Tickers are stored uppercased, so this seeks the ticker index; lower(ticker) would scan
+        .filter(Company.ticker == ticker.upper())
+        .first()
+    )
 
     if not company:
         raise HTTPException(status_code=404, detail=f"Company with ticker {ticker} not found")
 
-    # Get all filings
-    filings = (
-        db.query(Filing)
-        .filter(Filing.company_id == company.id)
-        .order_by(Filing.filing_date.desc())
-        .all()
-    )
+    # Filings are eager-loaded; order newest first
+    filings = sorted(company.filings, key=lambda f: f.filing_date, reverse=True)
+    latest_completed = next((f for f in filings if f.status == "completed"), None)
 
     # Get latest analysis
     latest_analysis = None
-    if filings:
-        latest_completed = next((f for f in filings if f.status == "completed"), None)
-        if latest_completed and latest_completed.analysis_result:
-            analysis = latest_completed.analysis_result
-            # Get risk assessments
-            risk_assessments = (
-                db.query(RiskAssessment)
-                .filter(RiskAssessment.filing_id == latest_completed.id)
-                .all()
-            )
-
-            risk_assessment_detail = {}
-            for ra in risk_assessments:
-                import json
-                risks = json.loads(ra.key_risks) if ra.key_risks else []
-                risk_assessment_detail[ra.category] = {
-                    "score": ra.score,
-                    "risks": risks
-                }
-
-            latest_analysis = {
-                "id": analysis.id,
-                "filing_id": analysis.filing_id,
-                "summary": analysis.summary,
-                "risk_assessment": risk_assessment_detail if risk_assessment_detail else None,
-                "created_at": analysis.created_at
+    if latest_completed and latest_completed.analysis_result:
+        analysis = latest_completed.analysis_result
+        risk_assessments = latest_completed.risk_assessments
+
+        risk_assessment_detail = {}
+        for ra in risk_assessments:
+            risks = ra.key_risks or []
+            risk_assessment_detail[ra.category] = {
+                "score": ra.score,
+                "risks": risks
             }
 
-    # Get risk scores
-    risk_scores = risk_calculator.get_company_risk_scores(db, company.id)
+        latest_analysis = {
+            "id": analysis.id,
+            "filing_id": analysis.filing_id,
+            "summary": analysis.summary,
+            "risk_assessment": risk_assessment_detail if risk_assessment_detail else None,
+            "created_at": analysis.created_at
+        }
+
+    # Risk scores come from the already loaded assessments of the latest completed filing
+    risk_scores = None
+    if latest_completed:
+        risk_scores = {ra.category: ra.score for ra in latest_completed.risk_assessments}
+        if risk_scores:
+            risk_scores["overall"] = risk_calculator.calculate_overall(risk_scores)
 
     return CompanyDetailResponse(
         id=company.id,
@@ -111,23 +194,19 @@ async def get_company(ticker: str, db: Session = Depends(get_db)):
         cik=company.cik,
         sector=company.sector,
         created_at=company.created_at,
-        filings=[FilingResponse(
-            id=f.id,
-            company_id=f.company_id,
-            filing_type=f.filing_type,
-            filing_date=f.filing_date,
-            fiscal_year=f.fiscal_year,
-            accession_number=f.accession_number,
-            status=f.status,
-            created_at=f.created_at
-        ) for f in filings],
+        filings=[FilingResponse.model_validate(f) for f in filings],
         latest_analysis=latest_analysis,
         risk_scores=RiskScores(**risk_scores) if risk_scores else None
     )
 
 
-@router.get("/sectors/list")
+@router.get("/sectors/list", dependencies=[Depends(cache_control(3600, 86400))])
 async def list_sectors(db: Session = Depends(get_db)):
     """List all unique sectors"""
-    sectors = db.query(Company.sector).distinct().filter(Company.sector.isnot(None)).all()
-    return {"sectors": [s[0] for s in sectors]}
+    sectors = _sectors_cache.get("sectors")
+    if sectors is None:
+        sectors = db.scalars(
+            select(Company.sector).where(Company.sector.isnot(None)).distinct()
+        ).all()
+        _sectors_cache["sectors"] = sectors
+    return {"sectors": sectors}
@@ -1,39 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy import Text, func, select, type_coerce
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.database import get_db
 from app.models import Filing, AnalysisResult, RiskAssessment
+from app.responses import ndjson_response
 from app.schemas import FilingResponse, AnalysisResponse
 
 router = APIRouter(prefix="/api/filings", tags=["filings"])
 
+# One compiled validator for a whole page of filings, read straight from rows
+_FILING_LIST = TypeAdapter(List[FilingResponse])
+
+# Characters of extracted section text returned with an analysis
+TEXT_PREVIEW_LENGTH = 1000
+
+
+def _preview(text: Optional[str]) -> Optional[str]:
+    """Mark text fetched with one extra character as truncated"""
+    if text and len(text) > TEXT_PREVIEW_LENGTH:
+        return text[:TEXT_PREVIEW_LENGTH] + "..."
+    return text
+
 
 @router.get("", response_model=List[FilingResponse])
 async def list_filings(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """List all filings with optional status filter"""
-    query = db.query(Filing)
+    """List all filings with optional status filter.
+
+    With stream=1 the filings are returned as NDJSON, one per line.
+    """
+    # Plain column rows: skips loading raw_content and building ORM instances
+    stmt = select(
+        Filing.id,
+        Filing.company_id,
+        Filing.filing_type,
+        Filing.filing_date,
+        Filing.fiscal_year,
+        Filing.accession_number,
+        Filing.status,
+        Filing.created_at,
+    )
 
     if status:
-        query = query.filter(Filing.status == status)
+        stmt = stmt.where(Filing.status == status)
+
+    stmt = stmt.order_by(Filing.filing_date.desc()).offset(skip).limit(limit)
 
-    filings = query.order_by(Filing.filing_date.desc()).offset(skip).limit(limit).all()
+    if stream:
+        return ndjson_response(
+            db,
+            stmt,
+            lambda rows: (
+                orjson.dumps(dict(row._mapping), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+            ),
+        )
 
-    return [FilingResponse(
-        id=f.id,
-        company_id=f.company_id,
-        filing_type=f.filing_type,
-        filing_date=f.filing_date,
-        fiscal_year=f.fiscal_year,
-        accession_number=f.accession_number,
-        status=f.status,
-        created_at=f.created_at
-    ) for f in filings]
+    rows = db.execute(stmt).all()
+
+    return _FILING_LIST.validate_python(rows, from_attributes=True)
 
 
 @router.get("/{filing_id}", response_model=FilingResponse)
@@ -44,27 +77,30 @@ async def get_filing(filing_id: int, db: Session = Depends(get_db)):
     if not filing:
         raise HTTPException(status_code=404, detail=f"Filing with id {filing_id} not found")
 
-    return FilingResponse(
-        id=filing.id,
-        company_id=filing.company_id,
-        filing_type=filing.filing_type,
-        filing_date=filing.filing_date,
-        fiscal_year=filing.fiscal_year,
-        accession_number=filing.accession_number,
-        status=filing.status,
-        created_at=filing.created_at
-    )
+    return FilingResponse.model_validate(filing)
 
 
 @router.get("/{filing_id}/analysis")
 async def get_filing_analysis(filing_id: int, db: Session = Depends(get_db)):
     """Get analysis results for a specific filing"""
-    filing = db.query(Filing).filter(Filing.id == filing_id).first()
+    filing_exists = db.scalar(select(Filing.id).where(Filing.id == filing_id))
 
-    if not filing:
+    if not filing_exists:
         raise HTTPException(status_code=404, detail=f"Filing with id {filing_id} not found")
 
-    analysis = db.query(AnalysisResult).filter(AnalysisResult.filing_id == filing_id).first()
+    # Truncate the long section texts in SQL so only the preview leaves the database
+    analysis = db.execute(
+        select(
+            AnalysisResult.id,
+            AnalysisResult.filing_id,
+            AnalysisResult.summary,
+            func.substr(AnalysisResult.risk_factors_text, 1, TEXT_PREVIEW_LENGTH + 1).label("risk_factors_text"),
+            func.substr(AnalysisResult.mda_text, 1, TEXT_PREVIEW_LENGTH + 1).label("mda_text"),
+            # Stored JSON text as-is: it is spliced into the response without decoding
+            type_coerce(AnalysisResult.analysis_json, Text).label("analysis_json"),
+            AnalysisResult.created_at,
+        ).where(AnalysisResult.filing_id == filing_id)
+    ).first()
 
     if not analysis:
         raise HTTPException(status_code=404, detail=f"Analysis not found for filing {filing_id}")
@@ -76,22 +112,25 @@ async def get_filing_analysis(filing_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
-    import json
     risk_assessment_detail = {}
     for ra in risk_assessments:
-        risks = json.loads(ra.key_risks) if ra.key_risks else []
+        risks = ra.key_risks or []
         risk_assessment_detail[ra.category] = {
             "score": ra.score,
             "severity": ra.severity,
             "risks": risks
         }
 
-    return {
+    envelope = orjson.dumps({
         "id": analysis.id,
         "filing_id": analysis.filing_id,
         "summary": analysis.summary,
-        "risk_factors_text": analysis.risk_factors_text[:1000] + "..." if analysis.risk_factors_text and len(analysis.risk_factors_text) > 1000 else analysis.risk_factors_text,
-        "mda_text": analysis.mda_text[:1000] + "..." if analysis.mda_text and len(analysis.mda_text) > 1000 else analysis.mda_text,
+        "risk_factors_text": _preview(analysis.risk_factors_text),
+        "mda_text": _preview(analysis.mda_text),
         "risk_assessment": risk_assessment_detail,
         "created_at": analysis.created_at
-    }
+    })
+    raw_analysis = analysis.analysis_json.encode() if analysis.analysis_json else b"null"
+    body = envelope[:-1] + b',"analysis_json":' + raw_analysis + b"}"
+
+    return Response(content=body, media_type="application/json")
@@ -1,29 +1,58 @@
+import asyncio
 import json
+import os
+import socket
+import threading
 from datetime import datetime
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from functools import lru_cache
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Optional
 
 from app.database import get_db, SessionLocal
 from app.models import Company, Filing, AnalysisResult, RiskAssessment, Job
+from app.responses import cache_control
 from app.schemas import JobResponse, JobStartResponse, RiskSummaryResponse
 from app.services.sec_fetcher import SECFetcher
 from app.services.gemini_analyzer import GeminiAnalyzer
+from app.services.llm_cache import LLMResponseCache
 from app.services.risk_calculator import RiskCalculator
+from app.services.job_worker import job_worker
 from app.config import settings
 from app.logging_config import job_logger as logger
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
+# Risk summary aggregates, reused until a job finishes or the TTL expires. Jobs
+# clear it from worker threads, so access goes through the lock.
+_risk_summary_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
+_risk_summary_lock = threading.Lock()
+# Last summary computed, kept without a TTL and served if the database is unreachable
+_risk_summary_fallback: Dict[str, RiskSummaryResponse] = {}
+
+
+def clear_risk_summary_cache():
+    """Drop the cached risk summary so the next request recomputes it"""
+    with _risk_summary_lock:
+        _risk_summary_cache.clear()
+
+
+@lru_cache(maxsize=1)
+def _read_sp100_file() -> tuple:
+    """Read the static S&P 100 ticker file once per process"""
+    with open("data/sp100_companies.json", "r") as f:
+        return tuple(json.load(f).get("companies", []))
+
 
 def load_sp100_tickers():
     """Load S&P 100 tickers from JSON file"""
     try:
-        with open("data/sp100_companies.json", "r") as f:
-            data = json.load(f)
-            tickers = data.get("companies", [])
-            logger.info("S&P 100 tickers loaded", count=len(tickers))
-            return tickers
+        tickers = list(_read_sp100_file())
+        logger.info("S&P 100 tickers loaded", count=len(tickers))
+        return tickers
     except Exception as e:
         logger.error(
             "Failed to load S&P 100 tickers",
@@ -33,12 +62,140 @@ def load_sp100_tickers():
         return []
 
 
+# Tickers fetched from SEC EDGAR at once; edgartools throttles requests below SEC's limit
+SEC_FETCH_CONCURRENCY = 10
+
+# Companies processed between progress-only commits
+PROGRESS_COMMIT_INTERVAL = 10
+
+
+async def _fetch_sec_data(fetcher: SECFetcher, semaphore: asyncio.Semaphore, ticker: str, need_info: bool):
+    """Fetch company info (when unknown) and the latest 10-K with its sections off the event loop"""
+    async with semaphore:
+        info = None
+        if need_info:
+            info = await asyncio.to_thread(fetcher.fetch_company_info, ticker)
+            if not info:
+                return None, None, None
+
+        filing_data = await asyncio.to_thread(fetcher.fetch_10k, ticker)
+        sections = await asyncio.to_thread(fetcher.extract_sections, filing_data) if filing_data else None
+        return info, filing_data, sections
+
+
+def _save_fetched_company(db: Session, fetcher: SECFetcher, company_data: dict, company_id: Optional[int], fetched) -> bool:
+    """Store a fetched company and its 10-K filing, returning whether anything was added"""
+    ticker = company_data["ticker"]
+    info, filing_data, sections = fetched
+    added = False
+
+    if company_id is None:
+        if not info:
+            return False
+        company = Company(
+            ticker=info["ticker"],
+            name=info["name"],
+            cik=info["cik"],
+            sector=company_data.get("sector", info.get("sector"))
+        )
+        db.add(company)
+        db.flush()  # Assigns the id; committed together with the filing
+        company_id = company.id
+        added = True
+        logger.info("Company created", ticker=ticker, company_id=company_id)
+
+    if filing_data:
+        filing = Filing(
+            company_id=company_id,
+            filing_type="10-K",
+            filing_date=datetime.strptime(sections["filing_date"], "%Y-%m-%d").date() if sections["filing_date"] else datetime.now().date(),
+            fiscal_year=sections.get("fiscal_year"),
+            accession_number=sections["accession_number"],
+            filing_url=fetcher.get_filing_url(filing_data),
+            raw_content=sections,
+            status="pending"
+        )
+        db.add(filing)
+        db.flush()
+        added = True
+        logger.info(
+            "Filing saved",
+            ticker=ticker,
+            filing_id=filing.id,
+            accession_number=sections["accession_number"]
+        )
+
+    return added
+
+
+async def _fetch_all_companies(db: Session, job: Job, fetcher: SECFetcher, companies_data: list):
+    """Fetch companies concurrently, saving each result from the event loop thread"""
+    # Two bulk lookups instead of a company and a filing query per ticker. Plain
+    # ids rather than ORM instances, so per-company commits don't expire them.
+    tickers = [c["ticker"] for c in companies_data]
+    company_ids = dict(
+        db.query(Company.ticker, Company.id).filter(Company.ticker.in_(tickers)).all()
+    )
+    # EXISTS semi-join: stops at a company's first 10-K, no join fan-out or DISTINCT
+    tickers_with_10k = {
+        ticker for (ticker,) in
+        db.query(Company.ticker)
+        .filter(Company.ticker.in_(tickers), Company.filings.any(Filing.filing_type == "10-K"))
+    }
+    semaphore = asyncio.Semaphore(SEC_FETCH_CONCURRENCY)
+
+    async def fetch(company_data: dict):
+        ticker = company_data["ticker"]
+        if ticker in tickers_with_10k:
+            return company_data, None
+        try:
+            return company_data, await _fetch_sec_data(
+                fetcher, semaphore, ticker, need_info=ticker not in company_ids
+            )
+        except Exception as e:
+            return company_data, e
+
+    tasks = [fetch(company_data) for company_data in companies_data]
+    for i, next_result in enumerate(asyncio.as_completed(tasks)):
+        company_data, fetched = await next_result
+        ticker = company_data.get("ticker", "unknown")
+        try:
+            logger.info(
+                "Processing company",
+                ticker=ticker,
+                progress=f"{i+1}/{len(companies_data)}"
+            )
+
+            if isinstance(fetched, Exception):
+                raise fetched
+
+            saved = False
+            if fetched is None:
+                logger.debug("Filing already exists", ticker=ticker)
+            else:
+                saved = _save_fetched_company(db, fetcher, company_data, company_ids.get(ticker), fetched)
+
+            # New rows are committed right away; progress alone only every few companies
+            job.completed_items = i + 1
+            if saved or (i + 1) % PROGRESS_COMMIT_INTERVAL == 0:
+                db.commit()
+
+        except Exception as e:
+            logger.error(
+                "Error processing company",
+                exception=e,
+                ticker=ticker
+            )
+            db.rollback()
+            continue
+
+
 def fetch_all_task(job_id: int):
     """Background task to fetch all S&P 100 filings"""
     db = SessionLocal()
     job = None
     try:
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = db.get(Job, job_id)
         if not job:
             logger.error("Job not found", job_id=job_id)
             return
@@ -54,88 +211,33 @@ def fetch_all_task(job_id: int):
         job.total_items = len(companies_data)
         db.commit()
 
-        for i, company_data in enumerate(companies_data):
-            try:
-                ticker = company_data["ticker"]
-                logger.info(
-                    "Processing company",
-                    ticker=ticker,
-                    progress=f"{i+1}/{len(companies_data)}"
-                )
-
-                # Check if company exists
-                company = db.query(Company).filter(Company.ticker == ticker).first()
-
-                if not company:
-                    # Fetch company info from SEC
-                    info = fetcher.fetch_company_info(ticker)
-                    if info:
-                        company = Company(
-                            ticker=info["ticker"],
-                            name=info["name"],
-                            cik=info["cik"],
-                            sector=company_data.get("sector", info.get("sector"))
-                        )
-                        db.add(company)
-                        db.commit()
-                        db.refresh(company)
-                        logger.info("Company created", ticker=ticker, company_id=company.id)
-
-                if company:
-                    # Check if we already have a recent filing
-                    existing_filing = (
-                        db.query(Filing)
-                        .filter(Filing.company_id == company.id, Filing.filing_type == "10-K")
-                        .order_by(Filing.filing_date.desc())
-                        .first()
-                    )
-
-                    # Fetch 10-K if we don't have one
-                    if not existing_filing:
-                        filing_data = fetcher.fetch_10k(ticker)
-                        if filing_data:
-                            sections = fetcher.extract_sections(filing_data)
-
-                            filing = Filing(
-                                company_id=company.id,
-                                filing_type="10-K",
-                                filing_date=datetime.strptime(sections["filing_date"], "%Y-%m-%d").date() if sections["filing_date"] else datetime.now().date(),
-                                fiscal_year=sections.get("fiscal_year"),
-                                accession_number=sections["accession_number"],
-                                filing_url=fetcher.get_filing_url(filing_data),
-                                raw_content=json.dumps(sections),
-                                status="pending"
-                            )
-                            db.add(filing)
-                            db.commit()
-                            logger.info(
-                                "Filing saved",
-                                ticker=ticker,
-                                filing_id=filing.id,
-                                accession_number=sections["accession_number"]
-                            )
-                    else:
-                        logger.debug("Filing already exists", ticker=ticker)
-
-                job.completed_items = i + 1
-                db.commit()
+        asyncio.run(_fetch_all_companies(db, job, fetcher, companies_data))
 
-            except Exception as e:
-                logger.error(
-                    "Error processing company",
-                    exception=e,
-                    ticker=company_data.get('ticker', 'unknown')
-                )
-                continue
-
-        job.status = "completed"
+        # Tickers skipped during an SEC rate-limit block were never looked up, so
+        # the job fails instead of reporting them as companies without a 10-K
+        skipped = sorted(fetcher.rate_limited_tickers)
         job.completed_at = datetime.utcnow()
-        db.commit()
-        logger.info(
-            "Fetch job completed",
-            job_id=job_id,
-            total_processed=job.completed_items
-        )
+        if skipped:
+            job.status = "failed"
+            job.error_message = (
+                f"SEC rate limit reached; {len(skipped)} tickers not fetched: {', '.join(skipped)}"
+            )
+            db.commit()
+            logger.error(
+                "Fetch job stopped by SEC rate limit",
+                error_code="SEC_RATE_LIMIT",
+                job_id=job_id,
+                skipped_count=len(skipped),
+                total_processed=job.completed_items
+            )
+        else:
+            job.status = "completed"
+            db.commit()
+            logger.info(
+                "Fetch job completed",
+                job_id=job_id,
+                total_processed=job.completed_items
+            )
 
     except Exception as e:
         logger.error(
@@ -150,6 +252,144 @@ def fetch_all_task(job_id: int):
             db.commit()
     finally:
         db.close()
+        # Progress is committed as the job runs, so any finished job may change the summary
+        clear_risk_summary_cache()
+
+
+# Filings whose analysis results are written per commit
+ANALYZE_COMMIT_BATCH_SIZE = 20
+
+
+def _set_filing_status(db: Session, filing_ids: list, status: str):
+    """Set the status of several filings in one UPDATE, without loading or expiring ORM rows"""
+    if filing_ids:
+        db.execute(
+            update(Filing)
+            .where(Filing.id.in_(filing_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def _analyze_filings(
+    db: Session, job_id: int, analyzer: GeminiAnalyzer, risk_calculator: RiskCalculator, pending_ids: list
+):
+    """Analyze filings batch by batch, submitting each batch to Gemini at once"""
+    for start in range(0, len(pending_ids), ANALYZE_COMMIT_BATCH_SIZE):
+        # Only one batch of filing content is loaded at a time, as plain values, so
+        # the commits below have no ORM instances to expire and reload row by row
+        batch = db.execute(
+            select(Filing.id, Filing.raw_content)
+            .where(Filing.id.in_(pending_ids[start:start + ANALYZE_COMMIT_BATCH_SIZE]))
+            .order_by(Filing.id)
+        ).all()
+
+        # Check content first so the whole batch is marked processing in one commit
+        to_analyze = []
+        no_content_ids = []
+        for i, (filing_id, sections) in enumerate(batch, start):
+            logger.info(
+                "Analyzing filing",
+                filing_id=filing_id,
+                progress=f"{i+1}/{len(pending_ids)}"
+            )
+
+            # Parse raw content
+            if not sections:
+                logger.warning("Filing has no content", filing_id=filing_id)
+                continue
+
+            risk_factors = sections.get("risk_factors", "")
+            mda = sections.get("mda", "")
+
+            if not risk_factors and not mda:
+                logger.warning(
+                    "Filing has no analyzable content",
+                    error_code="ANALYSIS_INCOMPLETE",
+                    filing_id=filing_id
+                )
+                no_content_ids.append(filing_id)
+                continue
+
+            to_analyze.append((filing_id, risk_factors, mda))
+        processing_ids = [filing_id for filing_id, _, _ in to_analyze]
+        _set_filing_status(db, no_content_ids, "error")
+        _set_filing_status(db, processing_ids, "processing")
+        db.commit()
+
+        try:
+            # Analyze with Gemini as one batch, saving the batch's results in a single commit
+            analysis_results = await analyzer.analyze_batch(
+                [(risk_factors, mda) for _, risk_factors, mda in to_analyze]
+            )
+
+            results = []
+            completed_ids = []
+            error_ids = []
+            for (filing_id, risk_factors, mda), analysis_result in zip(to_analyze, analysis_results):
+                try:
+                    if isinstance(analysis_result, Exception):
+                        raise analysis_result
+                    results.extend(_analysis_rows(filing_id, risk_factors, mda, analysis_result, risk_calculator))
+                    completed_ids.append(filing_id)
+                except Exception as e:
+                    logger.error(
+                        "Error analyzing filing",
+                        exception=e,
+                        filing_id=filing_id
+                    )
+                    error_ids.append(filing_id)
+
+            db.add_all(results)
+            _set_filing_status(db, completed_ids, "completed")
+            _set_filing_status(db, error_ids, "error")
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(completed_items=min(start + ANALYZE_COMMIT_BATCH_SIZE, len(pending_ids)))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            # Put the batch back in the queue rather than leaving it stuck in processing
+            db.rollback()
+            _set_filing_status(db, processing_ids, "pending")
+            db.commit()
+            raise
+
+
+def _analysis_rows(
+    filing_id: int, risk_factors: str, mda: str, analysis_result: dict, risk_calculator: RiskCalculator
+) -> list:
+    """Build the AnalysisResult and RiskAssessment rows for one analyzed filing"""
+    rows = [AnalysisResult(
+        filing_id=filing_id,
+        summary=analysis_result.get("summary", ""),
+        risk_factors_text=risk_factors[:50000],
+        mda_text=mda[:50000],
+        analysis_json=analysis_result
+    )]
+
+    risk_assessment = analysis_result.get("risk_assessment", {})
+    for category, data in risk_assessment.items():
+        if category in risk_calculator.RISK_CATEGORY_SET:
+            score = data.get("score", 5)
+            rows.append(RiskAssessment(
+                filing_id=filing_id,
+                category=category,
+                severity=risk_calculator.get_severity(score),
+                score=score,
+                key_risks=data.get("risks", [])
+            ))
+
+    logger.info(
+        "Filing analyzed successfully",
+        filing_id=filing_id,
+        overall_score=risk_calculator.calculate_overall(
+            {k: v.get("score", 5) for k, v in risk_assessment.items()}
+        )
+    )
+    return rows
 
 
 def analyze_all_task(job_id: int):
@@ -157,7 +397,7 @@ def analyze_all_task(job_id: int):
     db = SessionLocal()
     job = None
     try:
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = db.get(Job, job_id)
         if not job:
             logger.error("Job not found", job_id=job_id)
             return
@@ -179,99 +419,20 @@ def analyze_all_task(job_id: int):
             db.commit()
             return
 
-        analyzer = GeminiAnalyzer(settings.GEMINI_API_KEY)
+        analyzer = GeminiAnalyzer(settings.GEMINI_API_KEY, cache=LLMResponseCache())
         risk_calculator = RiskCalculator()
 
-        # Get pending filings
-        pending_filings = (
-            db.query(Filing)
-            .filter(Filing.status == "pending")
-            .all()
-        )
+        # Get pending filing ids; their content is loaded batch by batch
+        pending_ids = db.scalars(
+            select(Filing.id).where(Filing.status == "pending").order_by(Filing.id)
+        ).all()
 
-        job.total_items = len(pending_filings)
+        job.total_items = len(pending_ids)
         db.commit()
 
-        logger.info("Found pending filings", count=len(pending_filings))
-
-        for i, filing in enumerate(pending_filings):
-            try:
-                logger.info(
-                    "Analyzing filing",
-                    filing_id=filing.id,
-                    progress=f"{i+1}/{len(pending_filings)}"
-                )
-
-                # Parse raw content
-                if not filing.raw_content:
-                    logger.warning("Filing has no content", filing_id=filing.id)
-                    continue
-
-                sections = json.loads(filing.raw_content)
-                risk_factors = sections.get("risk_factors", "")
-                mda = sections.get("mda", "")
+        logger.info("Found pending filings", count=len(pending_ids))
 
-                if not risk_factors and not mda:
-                    logger.warning(
-                        "Filing has no analyzable content",
-                        error_code="ANALYSIS_INCOMPLETE",
-                        filing_id=filing.id
-                    )
-                    filing.status = "error"
-                    db.commit()
-                    continue
-
-                # Analyze with Gemini
-                filing.status = "processing"
-                db.commit()
-
-                analysis_result = analyzer.analyze(risk_factors, mda)
-
-                # Save analysis result
-                analysis = AnalysisResult(
-                    filing_id=filing.id,
-                    summary=analysis_result.get("summary", ""),
-                    risk_factors_text=risk_factors[:50000],
-                    mda_text=mda[:50000],
-                    analysis_json=json.dumps(analysis_result)
-                )
-                db.add(analysis)
-
-                # Save risk assessments
-                risk_assessment = analysis_result.get("risk_assessment", {})
-                for category, data in risk_assessment.items():
-                    if category in risk_calculator.RISK_CATEGORIES:
-                        score = data.get("score", 5)
-                        ra = RiskAssessment(
-                            filing_id=filing.id,
-                            category=category,
-                            severity=risk_calculator.get_severity(score),
-                            score=score,
-                            key_risks=json.dumps(data.get("risks", []))
-                        )
-                        db.add(ra)
-
-                filing.status = "completed"
-                job.completed_items = i + 1
-                db.commit()
-
-                logger.info(
-                    "Filing analyzed successfully",
-                    filing_id=filing.id,
-                    overall_score=risk_calculator.calculate_overall(
-                        {k: v.get("score", 5) for k, v in risk_assessment.items()}
-                    )
-                )
-
-            except Exception as e:
-                logger.error(
-                    "Error analyzing filing",
-                    exception=e,
-                    filing_id=filing.id
-                )
-                filing.status = "error"
-                db.commit()
-                continue
+        asyncio.run(_analyze_filings(db, job_id, analyzer, risk_calculator, pending_ids))
 
         job.status = "completed"
         job.completed_at = datetime.utcnow()
@@ -295,25 +456,86 @@ def analyze_all_task(job_id: int):
             db.commit()
     finally:
         db.close()
+        clear_risk_summary_cache()
 
 
-@router.post("/fetch-all", response_model=JobStartResponse)
-async def start_fetch_all(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """Start background job to fetch all S&P 100 filings"""
-    # Check if there's already a running fetch job
-    running_job = db.query(Job).filter(Job.job_type == "fetch", Job.status == "running").first()
-    if running_job:
-        logger.warning("Fetch job already running", existing_job_id=running_job.id)
-        raise HTTPException(status_code=400, detail="A fetch job is already running")
-
-    # Create new job
-    job = Job(job_type="fetch", status="pending")
+def _worker_id() -> str:
+    """Identify this server process, recorded on the jobs it runs"""
+    # Read the pid on each call, since server workers may fork after import
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process with this pid is still running on this host"""
+    if os.name != "posix":
+        # No signal-0 probe here (os.kill would terminate the process)
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _owner_gone(worker_id: Optional[str]) -> bool:
+    """Check whether the process that owns a job has exited"""
+    if not worker_id:
+        return True
+    host, _, pid = worker_id.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        # Owned by a process on another host, which this one cannot probe
+        return False
+    # This process is just starting, so none of its jobs can be in flight yet
+    return int(pid) == os.getpid() or not _process_alive(int(pid))
+
+
+def fail_interrupted_jobs():
+    """Mark jobs left pending or running by server processes that have exited as failed"""
+    db = SessionLocal()
+    try:
+        active = db.execute(
+            select(Job.id, Job.worker_id).where(Job.status.in_(("pending", "running")))
+        ).all()
+        # Jobs of other live server workers keep running
+        interrupted = [job_id for job_id, worker_id in active if _owner_gone(worker_id)]
+        if not interrupted:
+            return
+        db.execute(
+            update(Job)
+            .where(Job.id.in_(interrupted))
+            .values(status="failed", error_message="Interrupted by server restart")
+        )
+        db.commit()
+        logger.warning("Marked interrupted jobs as failed", count=len(interrupted))
+    finally:
+        db.close()
+
+
+def _create_job(db: Session, job_type: str, conflict_detail: str) -> Job:
+    """Insert a pending job, or raise 400 if one of this type is already pending or running"""
+    # The insert is the check: ix_jobs_one_active rejects a second active job of
+    # the same type, so concurrent starts cannot both get past a separate SELECT
+    job = Job(job_type=job_type, status="pending", worker_id=_worker_id())
     db.add(job)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.warning("Job already running", job_type=job_type)
+        raise HTTPException(status_code=400, detail=conflict_detail)
     db.refresh(job)
+    return job
+
+
+@router.post("/fetch-all", response_model=JobStartResponse)
+async def start_fetch_all(db: Session = Depends(get_db)):
+    """Start background job to fetch all S&P 100 filings"""
+    job = _create_job(db, "fetch", "A fetch job is already running")
 
-    # Start background task
-    background_tasks.add_task(fetch_all_task, job.id)
+    # Hand off to the job worker
+    job_worker.submit(fetch_all_task, job.id)
 
     logger.info("Fetch job queued", job_id=job.id)
 
@@ -325,22 +547,12 @@ async def start_fetch_all(background_tasks: BackgroundTasks, db: Session = Depen
 
 
 @router.post("/analyze-all", response_model=JobStartResponse)
-async def start_analyze_all(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def start_analyze_all(db: Session = Depends(get_db)):
     """Start background job to analyze all pending filings"""
-    # Check if there's already a running analyze job
-    running_job = db.query(Job).filter(Job.job_type == "analyze", Job.status == "running").first()
-    if running_job:
-        logger.warning("Analyze job already running", existing_job_id=running_job.id)
-        raise HTTPException(status_code=400, detail="An analyze job is already running")
-
-    # Create new job
-    job = Job(job_type="analyze", status="pending")
-    db.add(job)
-    db.commit()
-    db.refresh(job)
+    job = _create_job(db, "analyze", "An analyze job is already running")
 
-    # Start background task
-    background_tasks.add_task(analyze_all_task, job.id)
+    # Hand off to the job worker
+    job_worker.submit(analyze_all_task, job.id)
 
     logger.info("Analyze job queued", job_id=job.id)
 
@@ -351,54 +563,70 @@ async def start_analyze_all(background_tasks: BackgroundTasks, db: Session = Dep
     )
 
 
+# Job columns matching JobResponse, selected as plain rows rather than ORM objects
+JOB_RESPONSE_COLUMNS = tuple(getattr(Job, name) for name in JobResponse.model_fields)
+
+# Newest first; the id breaks ties between jobs created within the same second
+JOB_NEWEST_FIRST = (Job.created_at.desc(), Job.id.desc())
+
+
+def _job_response(row) -> JobResponse:
+    """Build a JobResponse from a job row without re-validating trusted column values"""
+    return JobResponse.model_construct(**row._mapping)
+
+
 @router.get("/status", response_model=Optional[JobResponse])
 async def get_job_status(job_id: Optional[int] = None, db: Session = Depends(get_db)):
     """Get status of a specific job or the latest running job"""
+    stmt = select(*JOB_RESPONSE_COLUMNS)
     if job_id:
-        job = db.query(Job).filter(Job.id == job_id).first()
+        stmt = stmt.where(Job.id == job_id)
     else:
         # Get the most recent job
-        job = db.query(Job).order_by(Job.created_at.desc()).first()
+        stmt = stmt.order_by(*JOB_NEWEST_FIRST).limit(1)
+
+    row = db.execute(stmt).first()
 
-    if not job:
+    if not row:
         return None
 
-    return JobResponse(
-        id=job.id,
-        job_type=job.job_type,
-        status=job.status,
-        total_items=job.total_items,
-        completed_items=job.completed_items,
-        error_message=job.error_message,
-        started_at=job.started_at,
-        completed_at=job.completed_at
-    )
+    return _job_response(row)
 
 
 @router.get("/history", response_model=list[JobResponse])
 async def get_job_history(limit: int = 10, db: Session = Depends(get_db)):
     """Get recent job history"""
-    jobs = db.query(Job).order_by(Job.created_at.desc()).limit(limit).all()
-
-    return [JobResponse(
-        id=j.id,
-        job_type=j.job_type,
-        status=j.status,
-        total_items=j.total_items,
-        completed_items=j.completed_items,
-        error_message=j.error_message,
-        started_at=j.started_at,
-        completed_at=j.completed_at
-    ) for j in jobs]
-
-
-@router.get("/risk-summary", response_model=RiskSummaryResponse)
-async def get_risk_summary(db: Session = Depends(get_db)):
+    rows = db.execute(select(*JOB_RESPONSE_COLUMNS).order_by(*JOB_NEWEST_FIRST).limit(limit)).all()
+
+    return [_job_response(row) for row in rows]
+
+
+@router.get("/risk-summary", response_model=RiskSummaryResponse, dependencies=[Depends(cache_control(60))])
+async def get_risk_summary(response: Response, db: Session = Depends(get_db)):
     """Get aggregated risk summary across all analyzed companies"""
-    calculator = RiskCalculator()
-    summary = calculator.get_risk_summary(db)
+    with _risk_summary_lock:
+        cached = _risk_summary_cache.get("summary")
+    if cached is not None:
+        return cached
+
+    try:
+        calculator = RiskCalculator()
+        summary = calculator.get_risk_summary(db)
+    except SQLAlchemyError as e:
+        stale = _risk_summary_fallback.get("summary")
+        if stale is None:
+            raise
+        logger.warning(
+            "Serving stale risk summary",
+            error_code="DB_CONNECTION_ERROR",
+            exception_message=str(e)
+        )
+        response.headers["Warning"] = '110 - "Response is Stale"'
+        # Replaces the route's public max-age, so caches drop the stale copy once the database is back
+        response.headers["Cache-Control"] = "no-store"
+        return stale
 
-    return RiskSummaryResponse(
+    result = RiskSummaryResponse(
         total_companies=summary["total_companies"],
         analyzed_companies=summary["analyzed_companies"],
         high_risk_count=summary["high_risk_count"],
@@ -407,3 +635,7 @@ async def get_risk_summary(db: Session = Depends(get_db)):
         average_risk_score=summary["average_risk_score"],
         risk_by_category=summary["risk_by_category"]
     )
+    with _risk_summary_lock:
+        _risk_summary_cache["summary"] = result
+        _risk_summary_fallback["summary"] = result
+    return result
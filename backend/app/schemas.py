@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date, datetime
 from typing import Optional, List
 
@@ -30,13 +30,14 @@ class CompanyResponse(CompanyBase):
     latest_filing_date: Optional[date] = None
     risk_scores: Optional[RiskScores] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CompanyListResponse(BaseModel):
     companies: List[CompanyResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when listed with skip_count
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 # Filing schemas
@@ -53,8 +54,7 @@ class FilingResponse(FilingBase):
     status: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Analysis schemas
@@ -78,8 +78,7 @@ class AnalysisResponse(BaseModel):
     risk_assessment: Optional[RiskAssessmentDetail] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Company detail with analysis
@@ -90,8 +89,7 @@ class CompanyDetailResponse(CompanyBase):
     latest_analysis: Optional[AnalysisResponse] = None
     risk_scores: Optional[RiskScores] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # Job schemas
@@ -105,8 +103,7 @@ class JobResponse(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 class JobStartResponse(BaseModel):
@@ -114,6 +111,8 @@ class JobStartResponse(BaseModel):
     status: str
     message: str
 
+    model_config = ConfigDict(defer_build=True)
+
 
 # Risk summary schemas
 class RiskSummaryResponse(BaseModel):
@@ -124,3 +123,5 @@ class RiskSummaryResponse(BaseModel):
     low_risk_count: int
     average_risk_score: Optional[float] = None
     risk_by_category: RiskScores
+
+    model_config = ConfigDict(defer_build=True)
@@ -1,85 +1,46 @@
-import json
-from typing import Dict, Any
-import google.generativeai as genai
+import asyncio
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple, Union
+import orjson
 
 from app.logging_config import gemini_logger as logger
+from app.services.risk_calculator import RiskCalculator
 
+# google.generativeai, imported by the first GeminiAnalyzer so app startup and
+# SEC-only workers never load the SDK
+genai = None
 
-class GeminiAnalyzer:
-    """Service for analyzing SEC filings using Google Gemini"""
-
-    def __init__(self, api_key: str):
-        """Initialize the Gemini analyzer with API key"""
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        logger.info("Gemini Analyzer initialized", model="gemini-1.5-flash")
-
-    def analyze(self, risk_factors: str, mda: str) -> Dict[str, Any]:
-        """Analyze SEC filing content and return structured analysis"""
-        prompt = self._build_prompt(risk_factors, mda)
-
-        logger.info(
-            "Starting analysis",
-            risk_factors_len=len(risk_factors),
-            mda_len=len(mda)
-        )
-
-        try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_response(response.text)
-            logger.info(
-                "Analysis completed",
-                summary_len=len(result.get("summary", "")),
-                categories=list(result.get("risk_assessment", {}).keys())
-            )
-            return result
-        except ValueError as e:
-            # Re-raise ValueError (parse errors) as-is
-            raise
-        except Exception as e:
-            if "rate" in str(e).lower() or "429" in str(e) or "quota" in str(e).lower():
-                logger.error(
-                    "Gemini rate limit exceeded",
-                    error_code="GEMINI_RATE_LIMIT",
-                    exception=e
-                )
-            else:
-                logger.error(
-                    "Gemini API error",
-                    error_code="GEMINI_API_ERROR",
-                    exception=e
-                )
-            raise ValueError(f"GEMINI_API_ERROR: {str(e)}")
+# Gemini requests in flight at once during a batch analysis
+BATCH_CONCURRENCY = 8
 
-    def _build_prompt(self, risk_factors: str, mda: str) -> str:
-        """Build the analysis prompt for Gemini"""
-        return f"""Analyze this SEC 10-K filing and return a JSON response with the following structure:
+# Static instructions that precede the filing sections in every prompt
+_PROMPT_PREFIX = """Analyze this SEC 10-K filing and return a JSON response with the following structure:
 
-{{
+{
     "summary": "A 3-paragraph executive summary covering: 1) Company overview and business performance, 2) Key financial highlights and trends, 3) Major challenges and outlook",
-    "risk_assessment": {{
-        "operational": {{
+    "risk_assessment": {
+        "operational": {
             "score": <number 1-10>,
             "risks": ["risk1", "risk2", "risk3"]
-        }},
-        "financial": {{
+        },
+        "financial": {
             "score": <number 1-10>,
             "risks": ["risk1", "risk2", "risk3"]
-        }},
-        "regulatory": {{
+        },
+        "regulatory": {
             "score": <number 1-10>,
             "risks": ["risk1", "risk2", "risk3"]
-        }},
-        "strategic": {{
+        },
+        "strategic": {
             "score": <number 1-10>,
             "risks": ["risk1", "risk2", "risk3"]
-        }},
-        "reputational": {{
+        },
+        "reputational": {
             "score": <number 1-10>,
             "risks": ["risk1", "risk2", "risk3"]
-        }}
-    }}
-}}
+        }
+    }
+}
 
 Risk Categories:
 - Operational: Supply chain, cybersecurity, process failures, labor issues
@@ -96,45 +57,172 @@ Score Guide:
 IMPORTANT: Return ONLY valid JSON, no markdown formatting or extra text.
 
 --- RISK FACTORS SECTION ---
-{risk_factors[:15000]}
-
---- MD&A SECTION ---
-{mda[:15000]}
 """
+_PROMPT_MIDDLE = "\n\n--- MD&A SECTION ---\n"
+
+
+def _load_genai():
+    """Import the Gemini SDK on first use"""
+    global genai
+    if genai is None:
+        import google.generativeai
+        genai = google.generativeai
+    return genai
+
+
+class GeminiAnalyzer:
+    """Service for analyzing SEC filings using Google Gemini"""
+
+    # Bump whenever the prompt changes so cached analyses from older prompts are not reused
+    PROMPT_VERSION = "v1"
+    # Filings are immutable, so analyses can be cached for a week
+    CACHE_TTL = 7 * 86400
+
+    def __init__(self, api_key: str, cache: Optional[Any] = None):
+        """Initialize the Gemini analyzer with API key and an optional response cache"""
+        sdk = _load_genai()
+        sdk.configure(api_key=api_key)
+        self.model = sdk.GenerativeModel('gemini-1.5-flash')
+        self.cache = cache
+        logger.info("Gemini Analyzer initialized", model="gemini-1.5-flash")
+
+    def analyze(self, risk_factors: str, mda: str) -> Dict[str, Any]:
+        """Analyze SEC filing content and return structured analysis"""
+        key = self._cache_key(risk_factors, mda)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self._cache_hit(key, cached)
+
+        prompt = self._start_analysis(risk_factors, mda)
+
+        try:
+            response = self.model.generate_content(prompt)
+            result = self._finish_analysis(response.text)
+        except ValueError:
+            # Re-raise ValueError (parse errors) as-is
+            raise
+        except Exception as e:
+            raise self._api_error(e)
+
+        if self.cache is not None:
+            self.cache.set(key, result, ttl=self.CACHE_TTL)
+        return result
+
+    async def analyze_async(self, risk_factors: str, mda: str) -> Dict[str, Any]:
+        """Async variant of analyze, so several filings can be analyzed concurrently"""
+        key = self._cache_key(risk_factors, mda)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return self._cache_hit(key, cached)
+
+        prompt = self._start_analysis(risk_factors, mda)
+
+        try:
+            response = await self.model.generate_content_async(prompt)
+            result = self._finish_analysis(response.text)
+        except ValueError:
+            # Re-raise ValueError (parse errors) as-is
+            raise
+        except Exception as e:
+            raise self._api_error(e)
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, result, ttl=self.CACHE_TTL)
+        return result
+
+    async def analyze_batch(
+        self, items: List[Tuple[str, str]], concurrency: int = BATCH_CONCURRENCY
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Analyze (risk_factors, mda) pairs concurrently, returning results or errors in input order"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def analyze_one(risk_factors: str, mda: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_async(risk_factors, mda)
+
+        logger.info("Starting batch analysis", batch_size=len(items), concurrency=concurrency)
+        return await asyncio.gather(
+            *[analyze_one(risk_factors, mda) for risk_factors, mda in items],
+            return_exceptions=True
+        )
+
+    def _cache_key(self, risk_factors: str, mda: str) -> str:
+        """Hash the prompt version and the section text the prompt actually uses"""
+        content = f"{self.PROMPT_VERSION}|{risk_factors[:15000]}|{mda[:15000]}"
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _cache_hit(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Log and return an analysis served from the cache"""
+        logger.info("Analysis served from cache", cache_key=key[:12])
+        return result
+
+    def _start_analysis(self, risk_factors: str, mda: str) -> str:
+        """Log the start of an analysis and return its prompt"""
+        logger.info(
+            "Starting analysis",
+            risk_factors_len=len(risk_factors),
+            mda_len=len(mda)
+        )
+        return self._build_prompt(risk_factors, mda)
+
+    def _finish_analysis(self, text: str) -> Dict[str, Any]:
+        """Parse a Gemini response and log the completed analysis"""
+        result = self._parse_response(text)
+        logger.info(
+            "Analysis completed",
+            summary_len=len(result.get("summary", "")),
+            categories=list(result.get("risk_assessment", {}).keys())
+        )
+        return result
+
+    def _api_error(self, e: Exception) -> ValueError:
+        """Log a Gemini API failure and wrap it as a ValueError"""
+        if "rate" in str(e).lower() or "429" in str(e) or "quota" in str(e).lower():
+            logger.error(
+                "Gemini rate limit exceeded",
+                error_code="GEMINI_RATE_LIMIT",
+                exception=e
+            )
+        else:
+            logger.error(
+                "Gemini API error",
+                error_code="GEMINI_API_ERROR",
+                exception=e
+            )
+        return ValueError(f"GEMINI_API_ERROR: {str(e)}")
+
+    def _build_prompt(self, risk_factors: str, mda: str) -> str:
+        """Build the analysis prompt for Gemini"""
+        return "".join((_PROMPT_PREFIX, risk_factors[:15000], _PROMPT_MIDDLE, mda[:15000], "\n"))
 
     def _parse_response(self, text: str) -> Dict[str, Any]:
         """Parse JSON from Gemini response"""
         try:
             logger.debug("Parsing Gemini response", response_len=len(text))
 
-            # Try to extract JSON from the response
-            cleaned = text.strip()
-
-            # Remove markdown code blocks if present
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            elif cleaned.startswith("```"):
-                cleaned = cleaned[3:]
+            # Try to extract JSON from the response, removing markdown code blocks if present
+            cleaned = text.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
 
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-
-            cleaned = cleaned.strip()
+            # Well-formed responses are the bare object; only scan for it otherwise
+            if cleaned.startswith("{") and cleaned.endswith("}"):
+                json_str = cleaned
+            else:
+                start = cleaned.find('{')
+                end = cleaned.rfind('}') + 1
 
-            # Find the JSON object
-            start = cleaned.find('{')
-            end = cleaned.rfind('}') + 1
+                if start == -1 or end == 0:
+                    logger.error(
+                        "No JSON object found in response",
+                        error_code="GEMINI_PARSE_ERROR",
+                        response_preview=text[:200]
+                    )
+                    raise ValueError("GEMINI_PARSE_ERROR: No JSON object found in response")
 
-            if start == -1 or end == 0:
-                logger.error(
-                    "No JSON object found in response",
-                    error_code="GEMINI_PARSE_ERROR",
-                    response_preview=text[:200]
-                )
-                raise ValueError("No JSON object found in response")
+                json_str = cleaned[start:end]
 
-            json_str = cleaned[start:end]
-            result = json.loads(json_str)
+            result = orjson.loads(json_str)
 
             # Validate required fields
             if "summary" not in result:
@@ -147,7 +235,7 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or extra text.
 
             return result
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(
                 "Failed to parse Gemini JSON response",
                 error_code="GEMINI_PARSE_ERROR",
@@ -158,11 +246,8 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting or extra text.
 
     def _default_risk_assessment(self) -> Dict[str, Any]:
         """Return default risk assessment structure"""
-        default_category = {"score": 5, "risks": ["Unable to assess"]}
+        # Built fresh per category: shallow copies of one template shared a single risks list
         return {
-            "operational": default_category.copy(),
-            "financial": default_category.copy(),
-            "regulatory": default_category.copy(),
-            "strategic": default_category.copy(),
-            "reputational": default_category.copy()
+            category: {"score": 5, "risks": ["Unable to assess"]}
+            for category in RiskCalculator.RISK_CATEGORIES
         }
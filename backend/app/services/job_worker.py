@@ -0,0 +1,61 @@
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from app.logging_config import job_logger as logger
+
+# One thread per job type, so a fetch and an analyze job can run side by side
+JOB_WORKER_THREADS = 2
+
+
+class JobWorker:
+    """Runs long jobs on dedicated worker threads, outside the request threadpool"""
+
+    def __init__(self, threads: int = JOB_WORKER_THREADS):
+        """Initialize the worker; threads start with the first submitted job"""
+        self.threads = threads
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args: Any):
+        """Queue a job function to run on a worker thread"""
+        with self._lock:
+            if self._queue is None:
+                self._start()
+            self._queue.put((func, args))
+
+    def shutdown(self):
+        """Stop the worker threads once the jobs already queued have run"""
+        with self._lock:
+            jobs, workers = self._queue, self._workers
+            self._queue, self._workers = None, []
+        if jobs is not None:
+            for _ in workers:
+                jobs.put(None)
+
+    def _start(self):
+        """Start a set of daemon threads on a fresh queue"""
+        self._queue = queue.SimpleQueue()
+        self._workers = [
+            threading.Thread(target=self._run, args=(self._queue,), name=f"job-worker-{i}", daemon=True)
+            for i in range(self.threads)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _run(self, jobs: queue.SimpleQueue):
+        """Run queued jobs until the stop sentinel arrives"""
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            func, args = item
+            try:
+                func(*args)
+            except Exception as e:
+                # Job functions handle their own errors; keep the worker alive regardless
+                logger.error("Job worker task crashed", exception=e, job=func.__name__)
+
+
+job_worker = JobWorker()
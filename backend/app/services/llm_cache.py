@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import SessionLocal
+from app.models import LLMCacheEntry
+from app.logging_config import gemini_logger as logger
+
+
+class LLMResponseCache:
+    """Cache of parsed LLM responses stored in the llm_cache table"""
+
+    def __init__(self, session_factory=SessionLocal):
+        """Initialize the cache with the session factory it reads and writes through"""
+        self.session_factory = session_factory
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a key, or None if missing or expired"""
+        db = self.session_factory()
+        try:
+            entry = db.get(LLMCacheEntry, key)
+            if entry is None or entry.expires_at <= datetime.utcnow():
+                return None
+            return entry.response_json
+        except SQLAlchemyError as e:
+            logger.warning("LLM cache read failed", cache_key=key[:12], exception_message=str(e))
+            return None
+        finally:
+            db.close()
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int):
+        """Store a response under a key for ttl seconds, replacing any previous entry"""
+        db = self.session_factory()
+        try:
+            db.merge(LLMCacheEntry(
+                input_hash=key,
+                response_json=value,
+                expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+            ))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning("LLM cache write failed", cache_key=key[:12], exception_message=str(e))
+        finally:
+            db.close()
@@ -1,14 +1,40 @@
 from typing import Dict, Optional, List
+from cachetools import LRUCache
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func
 
 from app.models import RiskAssessment, Filing, Company
 
 
+def _severity(score: float) -> str:
+    """Categorize a score into severity level"""
+    if score >= 7:
+        return "high"
+    elif score >= 4:
+        return "medium"
+    else:
+        return "low"
+
+
+# Severity of every whole score on the 0-10 scale, indexed by score
+_SEVERITY_BY_SCORE = tuple(_severity(score) for score in range(11))
+
+
 class RiskCalculator:
     """Service for calculating and aggregating risk scores"""
 
     RISK_CATEGORIES = ["operational", "financial", "regulatory", "strategic", "reputational"]
+    # Hashed membership test for the categories Gemini returns
+    RISK_CATEGORY_SET = frozenset(RISK_CATEGORIES)
+
+    def __init__(self):
+        # (company_id, latest completed filing id) -> scores. A newly analyzed
+        # filing changes the key, so entries never need explicit invalidation.
+        self._cache: LRUCache = LRUCache(maxsize=512)
+
+    def clear_cache(self):
+        """Drop all cached company risk scores"""
+        self._cache.clear()
 
     def calculate_overall(self, scores: Dict[str, int]) -> float:
         """Calculate weighted average of category scores"""
@@ -19,41 +45,105 @@ class RiskCalculator:
 
     def get_severity(self, score: int) -> str:
         """Categorize a score into severity level"""
-        if score >= 7:
-            return "high"
-        elif score >= 4:
-            return "medium"
-        else:
-            return "low"
+        if type(score) is int and 0 <= score <= 10:
+            return _SEVERITY_BY_SCORE[score]
+        return _severity(score)
 
     def get_company_risk_scores(self, db: Session, company_id: int) -> Optional[Dict[str, int]]:
         """Get the latest risk scores for a company"""
         # Get the latest filing for the company
-        latest_filing = (
-            db.query(Filing)
+        latest_filing_id = (
+            db.query(Filing.id)
             .filter(Filing.company_id == company_id, Filing.status == "completed")
             .order_by(Filing.filing_date.desc())
-            .first()
+            .limit(1)
+            .scalar()
         )
 
-        if not latest_filing:
+        if latest_filing_id is None:
             return None
 
-        # Get risk assessments for this filing
-        assessments = (
-            db.query(RiskAssessment)
-            .filter(RiskAssessment.filing_id == latest_filing.id)
+        key = (company_id, latest_filing_id)
+        if key in self._cache:
+            return self._cache[key]
+
+        # Get risk scores for this filing
+        scores = dict(
+            db.query(RiskAssessment.category, RiskAssessment.score)
+            .filter(RiskAssessment.filing_id == latest_filing_id)
             .all()
         )
 
-        scores = {}
-        for assessment in assessments:
-            scores[assessment.category] = assessment.score
-
         if scores:
             scores["overall"] = self.calculate_overall(scores)
 
-        return scores if scores else None
+        self._cache[key] = scores if scores else None
+        return self._cache[key]
+
+    def get_company_risk_scores_bulk(
+        self, db: Session, company_ids: List[int]
+    ) -> Dict[int, Dict[str, int]]:
+        """Get the latest risk scores for several companies in a fixed number of queries"""
+        if not company_ids:
+            return {}
+
+        # Latest completed filing date per company
+        latest_dates = (
+            db.query(Filing.company_id, func.max(Filing.filing_date).label("filing_date"))
+            .filter(Filing.company_id.in_(company_ids), Filing.status == "completed")
+            .group_by(Filing.company_id)
+            .subquery()
+        )
+        latest_filings = (
+            db.query(Filing.id, Filing.company_id)
+            .join(
+                latest_dates,
+                and_(
+                    Filing.company_id == latest_dates.c.company_id,
+                    Filing.filing_date == latest_dates.c.filing_date,
+                ),
+            )
+            .filter(Filing.status == "completed")
+            .all()
+        )
+
+        # Keep one filing per company if several share the latest date
+        filing_by_company: Dict[int, int] = {}
+        for filing_id, company_id in latest_filings:
+            filing_by_company[company_id] = max(filing_id, filing_by_company.get(company_id, 0))
+
+        # Serve cached companies, query assessments only for the rest
+        result: Dict[int, Dict[str, int]] = {}
+        company_by_filing = {}
+        for company_id, filing_id in filing_by_company.items():
+            key = (company_id, filing_id)
+            if key in self._cache:
+                if self._cache[key]:
+                    result[company_id] = self._cache[key]
+            else:
+                company_by_filing[filing_id] = company_id
+
+        if not company_by_filing:
+            return result
+
+        assessments = (
+            db.query(RiskAssessment.filing_id, RiskAssessment.category, RiskAssessment.score)
+            .filter(RiskAssessment.filing_id.in_(list(company_by_filing)))
+            .all()
+        )
+
+        fetched: Dict[int, Dict[str, int]] = {}
+        for filing_id, category, score in assessments:
+            fetched.setdefault(company_by_filing[filing_id], {})[category] = score
+
+        for filing_id, company_id in company_by_filing.items():
+            scores = fetched.get(company_id)
+            if scores:
+                scores["overall"] = self.calculate_overall(scores)
+                result[company_id] = scores
+            self._cache[(company_id, filing_id)] = scores or None
+
+        return result
 
     def get_risk_summary(self, db: Session) -> Dict:
         """Get aggregated risk summary across all companies"""
@@ -69,49 +159,38 @@ class RiskCalculator:
             .count()
         )
 
-        # Get all risk assessments for completed filings
-        assessments = (
-            db.query(RiskAssessment)
+        # Average score per category, computed in SQL
+        category_averages = (
+            db.query(RiskAssessment.category, func.avg(RiskAssessment.score))
             .join(Filing)
             .filter(Filing.status == "completed")
+            .group_by(RiskAssessment.category)
             .all()
         )
-
-        # Calculate averages by category
-        category_scores = {cat: [] for cat in self.RISK_CATEGORIES}
-        filing_overall_scores = {}
-
-        for assessment in assessments:
-            category_scores[assessment.category].append(assessment.score)
-
-            if assessment.filing_id not in filing_overall_scores:
-                filing_overall_scores[assessment.filing_id] = []
-            filing_overall_scores[assessment.filing_id].append(assessment.score)
-
-        # Calculate average by category
-        risk_by_category = {}
-        for cat, scores in category_scores.items():
-            risk_by_category[cat] = round(sum(scores) / len(scores), 1) if scores else None
-
-        # Calculate overall scores per filing and count severity levels
-        high_risk = 0
-        medium_risk = 0
-        low_risk = 0
-        all_overall_scores = []
-
-        for filing_id, scores in filing_overall_scores.items():
-            overall = sum(scores) / len(scores)
-            all_overall_scores.append(overall)
-
-            severity = self.get_severity(round(overall))
-            if severity == "high":
-                high_risk += 1
-            elif severity == "medium":
-                medium_risk += 1
-            else:
-                low_risk += 1
-
-        average_risk_score = round(sum(all_overall_scores) / len(all_overall_scores), 1) if all_overall_scores else None
+        risk_by_category = {cat: None for cat in self.RISK_CATEGORIES}
+        for category, average in category_averages:
+            if category in self.RISK_CATEGORY_SET:
+                risk_by_category[category] = round(average, 1)
+
+        # Overall score per filing, then severity counts and the grand average in one query.
+        # Overall scores are bucketed as get_severity(round(overall)) would: round() is
+        # half-to-even, so 6.5 rounds down to medium and 3.5 rounds up to medium.
+        per_filing = (
+            db.query(func.avg(RiskAssessment.score).label("overall"))
+            .join(Filing)
+            .filter(Filing.status == "completed")
+            .group_by(RiskAssessment.filing_id)
+            .subquery()
+        )
+        overall = per_filing.c.overall
+        high_risk, medium_risk, low_risk, average_overall = db.query(
+            func.coalesce(func.sum(case((overall > 6.5, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(overall <= 6.5, overall >= 3.5), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((overall < 3.5, 1), else_=0)), 0),
+            func.avg(overall),
+        ).one()
+
+        average_risk_score = round(average_overall, 1) if average_overall is not None else None
 
         return {
             "total_companies": total_companies,
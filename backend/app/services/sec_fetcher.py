@@ -1,20 +1,188 @@
-from typing import Optional, Dict, Any
-from edgar import Company, set_identity
+import importlib.util
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+import httpx
+from cachetools import TTLCache
+from edgar import Company, get_company_tickers, set_identity
 
 from app.logging_config import sec_logger as logger
 
+# Keep-alive connections held open to SEC EDGAR, enough for concurrent fetch jobs
+HTTP_POOL_SIZE = 20
+
+# How long live lookups are reused: company metadata for an hour, latest 10-Ks for a day
+COMPANY_INFO_TTL = 3600
+FILING_TTL = 86400
+
+# After a 429, SEC blocks the client for about ten minutes and requests made during
+# the block extend it; back off this long unless the response sends Retry-After
+RATE_LIMIT_COOLDOWN = 600
+
+# HTTP/2 multiplexes concurrent downloads over one connection; needs the h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def configure_http_pool(pool_size: int = HTTP_POOL_SIZE) -> None:
+    """Configure the HTTP client edgartools shares across requests: pool size and HTTP/2"""
+    try:
+        from edgar.httpclient import HTTP_MGR
+    except ImportError:
+        # Older edgartools releases open their own connections
+        return
+    # These are edgartools internals; leave its defaults alone on releases without them
+    if not isinstance(getattr(HTTP_MGR, "httpx_params", None), dict):
+        logger.warning("edgartools HTTP client not configurable, keeping its default pool")
+        return
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=30,
+    )
+    if HTTP_MGR.httpx_params.get("limits") == limits and HTTP_MGR.httpx_params.get("http2") is HTTP2_AVAILABLE:
+        return
+    HTTP_MGR.httpx_params["limits"] = limits
+    HTTP_MGR.httpx_params["http2"] = HTTP2_AVAILABLE
+    _pass_limits_to_transport(HTTP_MGR)
+    # The shared client is built once from these params; rebuild it so they take effect
+    if getattr(HTTP_MGR, "_client", None) is not None:
+        HTTP_MGR._client.close()
+        HTTP_MGR._client = None
+
+
+def _pass_limits_to_transport(http_mgr: Any) -> None:
+    """Hand the pool limits to the transport edgartools builds, which is what owns the pool"""
+    # httpx ignores Client(limits=...) when an explicit transport is given, and
+    # the transport params edgartools forwards stop at http2, proxy and verify
+    if getattr(http_mgr, "_forwards_limits", False):
+        return
+    transport_params = getattr(http_mgr, "_get_httpx_transport_params", None)
+    if not callable(transport_params):
+        # Releases without this hook build no explicit transport, so Client(limits=...) applies
+        logger.warning("edgartools transport params hook not found, pool limits left to the client")
+        return
+
+    def with_limits(params: Dict[str, Any]) -> Dict[str, Any]:
+        result = transport_params(params)
+        if "limits" in params:
+            result["limits"] = params["limits"]
+        return result
+
+    http_mgr._get_httpx_transport_params = with_limits
+    http_mgr._forwards_limits = True
+
+
+try:
+    from edgar.httprequests import TooManyRequestsError
+except ImportError:
+    # Older edgartools releases surface 429s only through the error message
+    TooManyRequestsError = None
+
+# Whole-word matches only, so messages like "failed to generate" don't count
+_RATE_LIMIT_MESSAGE = re.compile(r"\brate[ -]limit|\b429\b", re.IGNORECASE)
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    """Check whether an EDGAR request failed with HTTP 429"""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429
+    if TooManyRequestsError is not None and isinstance(e, TooManyRequestsError):
+        return True
+    # edgartools wraps some HTTP failures in its own exceptions, keeping only the message
+    return _RATE_LIMIT_MESSAGE.search(str(e)) is not None
+
 
 class SECFetcher:
     """Service for fetching SEC filings using edgartools"""
 
+    # Shared by all instances, since each job builds its own fetcher. Only
+    # successful lookups are stored, so failures are retried on the next call.
+    _company_cache: TTLCache = TTLCache(maxsize=1024, ttl=COMPANY_INFO_TTL)
+    _filing_cache: TTLCache = TTLCache(maxsize=1024, ttl=FILING_TTL)
+    _cache_lock = threading.Lock()
+    # time.monotonic() deadline before which live lookups are skipped after a 429
+    _rate_limited_until = 0.0
+
     def __init__(self, user_agent: str):
         """Initialize the SEC fetcher with user agent for identification"""
         set_identity(user_agent)
+        configure_http_pool()
         self.user_agent = user_agent
+        # Tickers this fetcher could not look up because SEC was rate limiting it
+        self.rate_limited_tickers: Set[str] = set()
+        self._ticker_map = self._load_ticker_map()
         logger.info("SEC Fetcher initialized", user_agent=user_agent)
 
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached company info and filings, and any rate-limit backoff"""
+        with cls._cache_lock:
+            cls._company_cache.clear()
+            cls._filing_cache.clear()
+            cls._rate_limited_until = 0.0
+
+    def _back_off(self, e: Exception, ticker: str):
+        """Stop live lookups, for all fetchers, until SEC's rate-limit block has expired"""
+        # edgartools raises TooManyRequestsError carrying the Retry-After header
+        cooldown = getattr(e, "retry_after", None) or RATE_LIMIT_COOLDOWN
+        cls = type(self)
+        with cls._cache_lock:
+            cls._rate_limited_until = max(cls._rate_limited_until, time.monotonic() + cooldown)
+        self.rate_limited_tickers.add(ticker.upper())
+
+    def _backing_off(self, ticker: str) -> bool:
+        """Check whether a live lookup should be skipped while rate limited"""
+        if time.monotonic() < self._rate_limited_until:
+            logger.warning("Skipping SEC request while rate limited", error_code="SEC_RATE_LIMIT", ticker=ticker)
+            self.rate_limited_tickers.add(ticker.upper())
+            return True
+        return False
+
+    def _cached(self, cache: TTLCache, key: str, fetch: Callable[..., Optional[Any]], *args: Any) -> Optional[Any]:
+        """Return a cached lookup, or run fetch and cache a non-None result"""
+        with self._cache_lock:
+            result = cache.get(key)
+        if result is not None:
+            return result
+        result = fetch(*args)
+        if result is not None:
+            with self._cache_lock:
+                cache[key] = result
+        return result
+
+    def _load_ticker_map(self) -> Dict[str, tuple]:
+        """Load SEC's ticker -> (CIK, company name) table once, so known tickers need no request"""
+        try:
+            tickers = get_company_tickers()
+            ticker_map = dict(zip(tickers["ticker"], zip(tickers["cik"], tickers["company"])))
+            logger.debug("SEC ticker map loaded", count=len(ticker_map))
+            return ticker_map
+        except Exception as e:
+            logger.warning(
+                "Failed to load SEC ticker map, falling back to live lookups",
+                error_code="SEC_CONNECTION_ERROR",
+                exception_message=str(e)
+            )
+            return {}
+
     def fetch_company_info(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Fetch company information from SEC EDGAR"""
+        known = self._ticker_map.get(ticker.upper())
+        if known:
+            cik, name = known
+            return {
+                "ticker": ticker.upper(),
+                "name": name,
+                "cik": str(cik).zfill(10),
+                "sector": None
+            }
+        return self._cached(self._company_cache, ticker.upper(), self._fetch_company_info_uncached, ticker)
+
+    def _fetch_company_info_uncached(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Look up company information with a live EDGAR request"""
+        if self._backing_off(ticker):
+            return None
         try:
             logger.debug("Fetching company info", ticker=ticker)
             company = Company(ticker)
@@ -27,6 +195,8 @@ class SECFetcher:
             logger.info("Company info fetched", ticker=ticker, name=company.name)
             return result
         except Exception as e:
+            if _is_rate_limited(e):
+                self._back_off(e, ticker)
             logger.error(
                 "Failed to fetch company info",
                 error_code="SEC_CONNECTION_ERROR",
@@ -37,6 +207,12 @@ class SECFetcher:
 
     def fetch_10k(self, ticker: str) -> Optional[Any]:
         """Fetch the latest 10-K filing for a company"""
+        return self._cached(self._filing_cache, ticker.upper(), self._fetch_10k_uncached, ticker)
+
+    def _fetch_10k_uncached(self, ticker: str) -> Optional[Any]:
+        """Look up the latest 10-K filing with a live EDGAR request"""
+        if self._backing_off(ticker):
+            return None
         try:
             logger.debug("Fetching 10-K filing", ticker=ticker)
             company = Company(ticker)
@@ -57,7 +233,8 @@ class SECFetcher:
             )
             return None
         except Exception as e:
-            if "rate" in str(e).lower() or "429" in str(e):
+            if _is_rate_limited(e):
+                self._back_off(e, ticker)
                 logger.error(
                     "SEC rate limit exceeded",
                     error_code="SEC_RATE_LIMIT",
@@ -115,8 +292,11 @@ class SECFetcher:
             item = getattr(tenk, item_name, None)
             if item is None:
                 return ""
-            text = str(item)
-            return text[:max_length] if len(text) > max_length else text
+            # edgartools hands sections back as complete strings with no incremental
+            # reader, so skip the str() round trip for them and slice unconditionally:
+            # a slice no longer than the string returns the string itself
+            text = item if isinstance(item, str) else str(item)
+            return text[:max_length]
         except Exception:
             return ""
 
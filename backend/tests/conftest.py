@@ -2,18 +2,37 @@
 Pytest configuration and fixtures for testing.
 """
 
+import os
+import shutil
+import tempfile
+
+import orjson
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
+# Point the app's own engine, which the lifespan and job worker threads use, at a
+# throwaway database so tests never touch the developer database. Set before
+# app.config is imported.
+_APP_DB_DIR = tempfile.mkdtemp(prefix="stock-analysis-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_APP_DB_DIR}/app.db"
+
 from app.main import app
-from app.database import Base, get_db
-from app.models import Company, Filing, AnalysisResult, RiskAssessment, Job
+from app.database import Base, get_db, json_serializer
+from app.models import Company, Filing, AnalysisResult, RiskAssessment
+
+
+def pytest_unconfigure(config):
+    """Remove the throwaway app database once the run is over."""
+    from app.database import engine as app_engine
+    app_engine.dispose()
+    shutil.rmtree(_APP_DB_DIR, ignore_errors=True)
 
 
 # Test database URL - use in-memory SQLite
-TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_DATABASE_URL = "sqlite:///:memory:"
 
 
 @pytest.fixture(scope="session")
@@ -21,8 +40,23 @@ def engine():
     """Create test database engine."""
     engine = create_engine(
         TEST_DATABASE_URL,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        # One shared connection, so every session sees the same in-memory database
+        poolclass=StaticPool,
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
     )
+
+    # pysqlite defers BEGIN to the first write, which breaks SAVEPOINTs;
+    # let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
@@ -30,21 +64,67 @@ def engine():
 
 @pytest.fixture(scope="function")
 def db_session(engine):
-    """Create a new database session for each test."""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = TestingSessionLocal()
+    """Create a database session whose changes are rolled back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Session commits release a SAVEPOINT inside the outer transaction
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
-        session.rollback()
-        # Clean up all data after each test
-        session.query(RiskAssessment).delete()
-        session.query(AnalysisResult).delete()
-        session.query(Filing).delete()
-        session.query(Company).delete()
-        session.query(Job).delete()
-        session.commit()
         session.close()
+        transaction.rollback()
+        connection.close()
+
+
+class QueryCounter:
+    """Count the SQL statements sent to the test database, ignoring savepoint control."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        # db_session wraps each commit in a SAVEPOINT; those are test plumbing, not queries
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            self.statements.append(statement)
+
+
+@pytest.fixture
+def sql_query_counter(engine):
+    """Count queries run against the test database; reset() before the code under test."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture(autouse=True)
+def clear_risk_score_cache():
+    """Keep cached risk scores, summaries, company totals and sectors from leaking between tests."""
+    from app.routers import companies, jobs
+    companies.risk_calculator.clear_cache()
+    companies._count_cache.clear()
+    companies._sectors_cache.clear()
+    jobs.clear_risk_summary_cache()
+    jobs._risk_summary_fallback.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_sec_fetcher_cache():
+    """Keep filings cached by one test from answering lookups in the next."""
+    from app.services.sec_fetcher import SECFetcher
+    SECFetcher.clear_cache()
+    yield
 
 
 @pytest.fixture(scope="function")
@@ -81,7 +161,6 @@ def sample_company(db_session):
 def sample_filing(db_session, sample_company):
     """Create a sample filing for testing."""
     from datetime import date
-    import json
 
     filing = Filing(
         company_id=sample_company.id,
@@ -89,11 +168,11 @@ def sample_filing(db_session, sample_company):
         filing_date=date(2024, 11, 1),
         fiscal_year=2024,
         accession_number="0000320193-24-000123",
-        raw_content=json.dumps({
+        raw_content={
             "risk_factors": "Sample risk factors text...",
             "mda": "Sample MD&A text...",
             "business": "Sample business description..."
-        }),
+        },
         status="pending"
     )
     db_session.add(filing)
@@ -105,14 +184,12 @@ def sample_filing(db_session, sample_company):
 @pytest.fixture
 def sample_analysis(db_session, sample_filing):
     """Create a sample analysis result for testing."""
-    import json
-
     analysis = AnalysisResult(
         filing_id=sample_filing.id,
         summary="This is a test summary of the 10-K filing.",
         risk_factors_text="Sample risk factors...",
         mda_text="Sample MD&A...",
-        analysis_json=json.dumps({
+        analysis_json={
             "summary": "Test summary",
             "risk_assessment": {
                 "operational": {"score": 5, "risks": ["Risk 1"]},
@@ -121,7 +198,7 @@ def sample_analysis(db_session, sample_filing):
                 "strategic": {"score": 3, "risks": ["Risk 4"]},
                 "reputational": {"score": 4, "risks": ["Risk 5"]}
             }
-        })
+        }
     )
     db_session.add(analysis)
 
@@ -138,7 +215,7 @@ def sample_analysis(db_session, sample_filing):
             category=category,
             severity="medium" if 4 <= score <= 6 else ("high" if score > 6 else "low"),
             score=score,
-            key_risks=json.dumps([f"Sample {category} risk"])
+            key_risks=[f"Sample {category} risk"]
         )
         db_session.add(ra)
 
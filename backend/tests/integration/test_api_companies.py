@@ -2,7 +2,10 @@
 Integration tests for /api/companies endpoints.
 """
 
+import json
+
 import pytest
+from sqlalchemy import insert
 
 
 class TestCompaniesAPI:
@@ -27,29 +30,109 @@ class TestCompaniesAPI:
         assert data["total"] == 1
         assert data["companies"][0]["ticker"] == "AAPL"
         assert data["companies"][0]["name"] == "Apple Inc."
+        assert response.headers["cache-control"] == "public, max-age=300, stale-while-revalidate=3600"
+        assert response.headers["vary"] == "Origin"
+
+    def test_list_companies_with_analysis(self, client, sample_analysis, sql_query_counter):
+        """Should include latest filing date and risk scores for analyzed companies."""
+        sql_query_counter.reset()
+        response = client.get("/api/companies")
+        assert sql_query_counter.count <= 5
+
+        assert response.status_code == 200
+        company = response.json()["companies"][0]
+        assert company["latest_filing_date"] == "2024-11-01"
+        assert company["risk_scores"]["operational"] == 5
+        assert company["risk_scores"]["overall"] == 4.4
+
+    def test_list_companies_stream(self, client, sample_analysis):
+        """Should stream companies as NDJSON matching the JSON list."""
+        expected = client.get("/api/companies").json()["companies"]
+
+        response = client.get("/api/companies?stream=1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == expected
 
     def test_list_companies_pagination(self, client, db_session):
         """Should respect skip and limit parameters."""
         from app.models import Company
 
-        # Create multiple companies
-        for i in range(15):
-            company = Company(
-                ticker=f"TST{i:02d}",
-                name=f"Test Company {i}",
-                cik=f"000000000{i:02d}",
-                sector="Technology"
-            )
-            db_session.add(company)
+        # Create multiple companies in one executemany INSERT
+        db_session.execute(insert(Company), [
+            {
+                "ticker": f"TST{i:02d}",
+                "name": f"Test Company {i}",
+                "cik": f"000000000{i:02d}",
+                "sector": "Technology",
+            }
+            for i in range(15)
+        ])
         db_session.commit()
 
-        # Test pagination
-        response = client.get("/api/companies?skip=5&limit=5")
+        # Follow next_cursor links through every page
+        tickers = []
+        url = "/api/companies?limit=5"
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["companies"]) == 5
+            assert data["total"] == 15
+            tickers += [c["ticker"] for c in data["companies"]]
+            url = data["next_cursor"] and f"/api/companies?limit=5&cursor={data['next_cursor']}"
 
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data["companies"]) == 5
-        assert data["total"] == 15
+        assert tickers == [f"TST{i:02d}" for i in range(15)]
+
+        # Deprecated offset paging still works
+        data = client.get("/api/companies?skip=5&limit=5").json()
+        assert [c["ticker"] for c in data["companies"]] == tickers[5:10]
+
+        # Without the count, has_more still reports whether another page follows
+        data = client.get("/api/companies?skip=5&limit=5&skip_count=1").json()
+        assert data["total"] is None
+        assert data["has_more"] is True
+        data = client.get("/api/companies?skip=10&limit=5&skip_count=1").json()
+        assert data["has_more"] is False
+
+    def test_list_companies_cursor_breaks_ticker_ties(self, client, db_session):
+        """Should page through companies sharing a ticker without skipping any."""
+        from app.models import Company
+
+        db_session.add_all([
+            Company(ticker="DUP", name=f"Duplicate {i}", cik=f"00000001{i:02d}") for i in range(3)
+        ])
+        db_session.commit()
+
+        first = client.get("/api/companies?limit=2").json()
+        second = client.get(f"/api/companies?limit=2&cursor={first['next_cursor']}").json()
+
+        names = [c["name"] for c in first["companies"] + second["companies"]]
+        assert sorted(names) == ["Duplicate 0", "Duplicate 1", "Duplicate 2"]
+        assert second["next_cursor"] is None
+
+    def test_list_companies_caches_total(self, client, db_session, sample_company, sql_query_counter):
+        """Should reuse a recent total until a company is added."""
+        from app.models import Company
+
+        assert client.get("/api/companies").json()["total"] == 1
+        sql_query_counter.reset()
+        assert client.get("/api/companies").json()["total"] == 1
+        assert not any("count(" in statement for statement in sql_query_counter.statements)
+
+        db_session.add(Company(ticker="MSFT", name="Microsoft Corporation", cik="0000789019"))
+        db_session.commit()
+
+        data = client.get("/api/companies").json()
+        assert data["total"] == 2
+        assert len(data["companies"]) == 2
+
+    def test_list_companies_invalid_cursor(self, client):
+        """Should reject a cursor that was not issued by the API."""
+        response = client.get("/api/companies?cursor=not-a-cursor")
+
+        assert response.status_code == 400
 
     def test_list_companies_filter_by_sector(self, client, db_session):
         """Should filter companies by sector."""
@@ -68,9 +151,11 @@ class TestCompaniesAPI:
         assert len(data["companies"]) == 1
         assert data["companies"][0]["ticker"] == "TECH"
 
-    def test_get_company_by_ticker(self, client, sample_company):
+    def test_get_company_by_ticker(self, client, sample_company, sql_query_counter):
         """Should return company details by ticker."""
+        sql_query_counter.reset()
         response = client.get("/api/companies/AAPL")
+        assert sql_query_counter.count <= 4
 
         assert response.status_code == 200
         data = response.json()
@@ -79,6 +164,33 @@ class TestCompaniesAPI:
         assert data["cik"] == "0000320193"
         assert "filings" in data
         assert "risk_scores" in data
+        assert response.headers["cache-control"] == "public, max-age=600"
+
+    def test_get_company_query_count_is_constant(self, client, db_session, sql_query_counter, sample_analysis):
+        """Should load the detail view in a fixed number of queries however many filings exist."""
+        from datetime import date
+        from app.models import Filing
+
+        for i in range(5):
+            db_session.add(Filing(
+                company_id=sample_analysis.filing.company_id,
+                filing_type="10-K",
+                filing_date=date(2015 + i, 1, 1),
+                accession_number=f"0000320193-{i:02d}-000001",
+                status="pending",
+            ))
+        db_session.commit()
+
+        sql_query_counter.reset()
+        response = client.get("/api/companies/AAPL")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["filings"]) == 6
+        assert data["risk_scores"]["operational"] == 5
+        assert data["risk_scores"]["overall"] == 4.4
+        # Company, filings, analysis results, risk assessments
+        assert sql_query_counter.count == 4
 
     def test_get_company_case_insensitive(self, client, sample_company):
         """Should handle ticker in any case."""
@@ -88,6 +200,22 @@ class TestCompaniesAPI:
         data = response.json()
         assert data["ticker"] == "AAPL"
 
+    def test_get_company_stored_ticker_normalized(self, client, db_session):
+        """Should store tickers uppercased and look them up through the ticker index."""
+        from app.models import Company
+
+        db_session.add(Company(ticker="msft", name="Microsoft Corp", cik="0000789019"))
+        db_session.commit()
+
+        response = client.get("/api/companies/Msft")
+
+        assert response.status_code == 200
+        assert response.json()["ticker"] == "MSFT"
+        plan = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM companies WHERE ticker = ?", ("MSFT",)
+        ).all()
+        assert "ix_companies_ticker" in " ".join(row[-1] for row in plan)
+
     def test_get_company_not_found(self, client):
         """Should return 404 for unknown ticker."""
         response = client.get("/api/companies/INVALID")
@@ -95,9 +223,11 @@ class TestCompaniesAPI:
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
 
-    def test_get_company_with_analysis(self, client, sample_analysis):
+    def test_get_company_with_analysis(self, client, sample_analysis, sql_query_counter):
         """Should include analysis data for company with completed filing."""
+        sql_query_counter.reset()
         response = client.get("/api/companies/AAPL")
+        assert sql_query_counter.count <= 4
 
         assert response.status_code == 200
         data = response.json()
@@ -121,3 +251,22 @@ class TestCompaniesAPI:
         data = response.json()
         assert "sectors" in data
         assert set(data["sectors"]) == {"Technology", "Finance"}
+        assert response.headers["cache-control"] == "public, max-age=3600, stale-while-revalidate=86400"
+        assert response.headers["vary"] == "Origin"
+
+    def test_list_sectors_cached_until_company_added(self, client, db_session, sql_query_counter):
+        """Should serve repeat sector lists from cache and refresh after ingestion."""
+        from app.models import Company
+
+        db_session.add(Company(ticker="T1", name="Tech 1", cik="0000000001", sector="Technology"))
+        db_session.commit()
+        client.get("/api/companies/sectors/list")
+
+        sql_query_counter.reset()
+        assert client.get("/api/companies/sectors/list").json()["sectors"] == ["Technology"]
+        assert sql_query_counter.count == 0
+
+        db_session.add(Company(ticker="F1", name="Fin 1", cik="0000000002", sector="Finance"))
+        db_session.commit()
+
+        assert set(client.get("/api/companies/sectors/list").json()["sectors"]) == {"Technology", "Finance"}
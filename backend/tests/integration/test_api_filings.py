@@ -0,0 +1,84 @@
+"""
+Integration tests for /api/filings endpoints.
+"""
+
+import json
+
+
+class TestFilingsAPI:
+    """Integration tests for filings endpoints."""
+
+    def test_list_filings_empty(self, client):
+        """Should return empty list when no filings exist."""
+        response = client.get("/api/filings")
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_list_filings_with_data(self, client, sample_filing):
+        """Should return filings without raw content."""
+        response = client.get("/api/filings")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["id"] == sample_filing.id
+        assert data[0]["accession_number"] == "0000320193-24-000123"
+        assert data[0]["filing_date"] == "2024-11-01"
+        assert "raw_content" not in data[0]
+
+    def test_list_filings_filter_by_status(self, client, sample_filing):
+        """Should filter filings by status."""
+        assert len(client.get("/api/filings?status=pending").json()) == 1
+        assert client.get("/api/filings?status=completed").json() == []
+
+    def test_list_filings_stream(self, client, sample_filing):
+        """Should stream filings as NDJSON matching the JSON list."""
+        expected = client.get("/api/filings").json()
+
+        response = client.get("/api/filings?stream=1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line) for line in lines] == expected
+
+    def test_get_filing_not_found(self, client):
+        """Should return 404 for unknown filing."""
+        response = client.get("/api/filings/999")
+
+        assert response.status_code == 404
+
+    def test_get_filing_analysis(self, client, sample_analysis):
+        """Should return analysis with risk assessment by category."""
+        response = client.get(f"/api/filings/{sample_analysis.filing_id}/analysis")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["summary"] == "This is a test summary of the 10-K filing."
+        assert data["risk_factors_text"] == "Sample risk factors..."
+        assert data["risk_assessment"]["operational"] == {
+            "score": 5,
+            "severity": "medium",
+            "risks": ["Sample operational risk"],
+        }
+        assert data["analysis_json"] == sample_analysis.analysis_json
+        assert data["created_at"] is not None
+
+    def test_get_filing_analysis_truncates_text(self, client, db_session, sample_analysis):
+        """Should return only the first 1000 characters of long section text."""
+        sample_analysis.risk_factors_text = "r" * 5000
+        sample_analysis.mda_text = "m" * 1000
+        db_session.commit()
+
+        data = client.get(f"/api/filings/{sample_analysis.filing_id}/analysis").json()
+
+        assert data["risk_factors_text"] == "r" * 1000 + "..."
+        assert data["mda_text"] == "m" * 1000
+
+    def test_get_filing_analysis_not_found(self, client, sample_filing):
+        """Should return 404 when filing has no analysis."""
+        response = client.get(f"/api/filings/{sample_filing.id}/analysis")
+
+        assert response.status_code == 404
+        assert "analysis not found" in response.json()["detail"].lower()
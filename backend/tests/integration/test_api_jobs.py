@@ -2,8 +2,26 @@
 Integration tests for /api/jobs endpoints.
 """
 
+import asyncio
+import os
+import socket
+import threading
+import time
+
 import pytest
-from app.models import Job
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.models import AnalysisResult, Company, Filing, Job, RiskAssessment
+from app.routers.jobs import (
+    SEC_FETCH_CONCURRENCY, _analyze_filings, analyze_all_task, clear_risk_summary_cache, fail_interrupted_jobs,
+    fetch_all_task,
+)
+from app.services.gemini_analyzer import GeminiAnalyzer
+from app.services.risk_calculator import RiskCalculator
 
 
 class TestJobsAPI:
@@ -35,6 +53,32 @@ class TestJobsAPI:
         assert response.status_code == 400
         assert "already running" in response.json()["detail"].lower()
 
+    def test_fetch_all_blocks_while_pending(self, client, db_session):
+        """Should prevent a second fetch job while the first is still queued."""
+        first = client.post("/api/jobs/fetch-all")
+
+        second = client.post("/api/jobs/fetch-all")
+
+        assert first.status_code == 200
+        assert second.status_code == 400
+        assert "already running" in second.json()["detail"].lower()
+        assert db_session.query(Job).filter(Job.job_type == "fetch").count() == 1
+
+    def test_one_active_job_per_type_enforced_by_database(self, db_session):
+        """Should reject a second active job of a type even without the endpoint check."""
+        db_session.add_all([
+            Job(job_type="fetch", status="completed"),
+            Job(job_type="fetch", status="failed"),
+            Job(job_type="analyze", status="running"),
+            Job(job_type="fetch", status="running"),
+        ])
+        db_session.commit()
+
+        db_session.add(Job(job_type="fetch", status="pending"))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+
     def test_analyze_all_starts_job(self, client, db_session):
         """Should create and start an analyze job."""
         response = client.post("/api/jobs/analyze-all")
@@ -61,13 +105,16 @@ class TestJobsAPI:
         assert response.status_code == 400
         assert "already running" in response.json()["detail"].lower()
 
-    def test_get_job_status_by_id(self, client, db_session):
+    def test_get_job_status_by_id(self, client, db_session, sql_query_counter):
         """Should return job status by ID."""
         job = Job(job_type="fetch", status="completed", total_items=100, completed_items=100)
         db_session.add(job)
         db_session.commit()
+        job_id = job.id
 
-        response = client.get(f"/api/jobs/status?job_id={job.id}")
+        sql_query_counter.reset()
+        response = client.get(f"/api/jobs/status?job_id={job_id}")
+        assert sql_query_counter.count == 1
 
         assert response.status_code == 200
         data = response.json()
@@ -96,15 +143,17 @@ class TestJobsAPI:
         assert response.status_code == 200
         assert response.json() is None
 
-    def test_get_job_history(self, client, db_session):
+    def test_get_job_history(self, client, db_session, sql_query_counter):
         """Should return job history."""
         # Create multiple jobs
-        for i in range(5):
-            job = Job(job_type="fetch" if i % 2 == 0 else "analyze", status="completed")
-            db_session.add(job)
+        db_session.execute(insert(Job), [
+            {"job_type": "fetch" if i % 2 == 0 else "analyze", "status": "completed"} for i in range(5)
+        ])
         db_session.commit()
 
+        sql_query_counter.reset()
         response = client.get("/api/jobs/history")
+        assert sql_query_counter.count == 1
 
         assert response.status_code == 200
         data = response.json()
@@ -112,9 +161,7 @@ class TestJobsAPI:
 
     def test_get_job_history_limit(self, client, db_session):
         """Should respect limit parameter."""
-        for i in range(10):
-            job = Job(job_type="fetch", status="completed")
-            db_session.add(job)
+        db_session.execute(insert(Job), [{"job_type": "fetch", "status": "completed"} for _ in range(10)])
         db_session.commit()
 
         response = client.get("/api/jobs/history?limit=3")
@@ -123,6 +170,28 @@ class TestJobsAPI:
         data = response.json()
         assert len(data) == 3
 
+    def test_get_job_history_uses_created_index(self, client, db_session, sql_query_counter):
+        """Should read the newest jobs from the index without sorting a large table."""
+        db_session.execute(
+            insert(Job),
+            [{"job_type": "fetch", "status": "completed"} for _ in range(10000)],
+        )
+        db_session.commit()
+        newest = db_session.query(func.max(Job.id)).scalar()
+        sql_query_counter.reset()
+
+        response = client.get("/api/jobs/history?limit=5")
+
+        assert response.status_code == 200
+        assert [job["id"] for job in response.json()] == list(range(newest, newest - 5, -1))
+        assert sql_query_counter.count == 1
+        plan = db_session.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {sql_query_counter.statements[0]}", (5, 0)
+        ).all()
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_jobs_created" in details
+        assert "TEMP B-TREE" not in details
+
     def test_get_risk_summary_empty(self, client):
         """Should return zeros for empty database."""
         response = client.get("/api/jobs/risk-summary")
@@ -141,3 +210,280 @@ class TestJobsAPI:
         assert data["total_companies"] == 1
         assert data["analyzed_companies"] == 1
         assert "risk_by_category" in data
+        assert response.headers["cache-control"] == "public, max-age=60"
+
+    def test_get_risk_summary_cached_until_job_finishes(self, client, db_session, sample_company):
+        """Should reuse the summary until a background job finishes."""
+        assert client.get("/api/jobs/risk-summary").json()["total_companies"] == 1
+
+        db_session.add(Company(ticker="MSFT", name="Microsoft Corporation", cik="0000789019"))
+        db_session.commit()
+        assert client.get("/api/jobs/risk-summary").json()["total_companies"] == 1
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session):
+            analyze_all_task(job_id=999)
+
+        assert client.get("/api/jobs/risk-summary").json()["total_companies"] == 2
+
+    def test_get_risk_summary_serves_stale_when_db_fails(self, client, sample_analysis):
+        """Should fall back to the last summary with a stale warning if the database fails."""
+        fresh = client.get("/api/jobs/risk-summary").json()
+        clear_risk_summary_cache()
+
+        error = OperationalError("SELECT 1", {}, Exception("database is locked"))
+        with patch("app.routers.jobs.RiskCalculator.get_risk_summary", side_effect=error):
+            response = client.get("/api/jobs/risk-summary")
+
+        assert response.status_code == 200
+        assert response.json() == fresh
+        assert response.headers["warning"] == '110 - "Response is Stale"'
+        assert response.headers["cache-control"] == "no-store"
+
+    def test_get_risk_summary_db_failure_without_fallback(self, client):
+        """Should surface the database error when no summary was computed yet."""
+        error = OperationalError("SELECT 1", {}, Exception("database is locked"))
+        with patch("app.routers.jobs.RiskCalculator.get_risk_summary", side_effect=error):
+            with pytest.raises(OperationalError):
+                client.get("/api/jobs/risk-summary")
+
+
+class TestBackgroundTasks:
+    """Tests for the background fetch and analyze tasks."""
+
+    def test_fetch_all_task_saves_companies_and_filings(self, db_session, sample_filing):
+        """Should fetch new companies concurrently and skip ones with a 10-K."""
+        job = Job(job_type="fetch", status="pending")
+        db_session.add(job)
+        db_session.commit()
+
+        tickers = [{"ticker": "AAPL"}] + [{"ticker": f"T{i}", "sector": "Tech"} for i in range(15)]
+        fetcher = MagicMock()
+        fetcher.fetch_company_info.side_effect = lambda t: {"ticker": t, "name": f"{t} Inc.", "cik": t}
+        fetcher.fetch_10k.side_effect = lambda t: t
+        fetcher.extract_sections.side_effect = lambda t: {
+            "risk_factors": "risks", "mda": "mda", "business": "",
+            "accession_number": f"{t}-24-000001", "filing_date": "2024-01-31", "fiscal_year": 2023,
+        }
+        fetcher.get_filing_url.return_value = "https://www.sec.gov/x"
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.SECFetcher", return_value=fetcher), \
+             patch("app.routers.jobs.load_sp100_tickers", return_value=tickers):
+            fetch_all_task(job.id)
+
+        job = db_session.query(Job).filter(Job.id == job.id).one()
+        assert job.status == "completed"
+        assert job.completed_items == 16
+        assert db_session.query(Company).count() == 16
+        assert db_session.query(Filing).count() == 16
+        # AAPL already had a 10-K, so it was never fetched
+        assert fetcher.fetch_10k.call_count == 15
+        assert "AAPL" not in [c.args[0] for c in fetcher.fetch_company_info.call_args_list]
+
+    def test_fail_interrupted_jobs_spares_live_workers(self, db_session):
+        """Should fail only active jobs whose server process has exited."""
+        host = socket.gethostname()
+        dead_pid = 2 ** 22 + 1  # Above Linux's pid_max, so never a live process
+        jobs = {
+            "unowned": Job(job_type="fetch", status="running"),
+            "dead": Job(job_type="analyze", status="pending", worker_id=f"{host}:{dead_pid}"),
+            "this_process": Job(job_type="backfill", status="running", worker_id=f"{host}:{os.getpid()}"),
+            "live_worker": Job(job_type="refresh", status="running", worker_id=f"{host}:{os.getppid()}"),
+            "other_host": Job(job_type="sync", status="running", worker_id="elsewhere:123"),
+            "finished": Job(job_type="fetch", status="completed"),
+        }
+        db_session.add_all(jobs.values())
+        db_session.commit()
+        job_ids = {name: job.id for name, job in jobs.items()}
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session):
+            fail_interrupted_jobs()
+
+        statuses = {name: db_session.get(Job, job_id).status for name, job_id in job_ids.items()}
+        assert statuses == {
+            "unowned": "failed",
+            "dead": "failed",
+            "this_process": "failed",
+            "live_worker": "running",
+            "other_host": "running",
+            "finished": "completed",
+        }
+
+    def test_start_job_records_worker(self, client, db_session):
+        """Should record which server process owns a started job."""
+        job_id = client.post("/api/jobs/analyze-all").json()["job_id"]
+
+        job = db_session.get(Job, job_id)
+        assert job.worker_id == f"{socket.gethostname()}:{os.getpid()}"
+
+    def test_fetch_all_task_fails_when_rate_limited(self, db_session):
+        """Should fail the job and name the tickers skipped during an SEC rate-limit block."""
+        job = Job(job_type="fetch", status="pending")
+        db_session.add(job)
+        db_session.commit()
+
+        fetcher = MagicMock()
+        fetcher.fetch_company_info.side_effect = lambda t: None
+        fetcher.rate_limited_tickers = {"MSFT", "GOOG"}
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.SECFetcher", return_value=fetcher), \
+             patch("app.routers.jobs.load_sp100_tickers", return_value=[{"ticker": "MSFT"}, {"ticker": "GOOG"}]):
+            fetch_all_task(job.id)
+
+        job = db_session.query(Job).filter(Job.id == job.id).one()
+        assert job.status == "failed"
+        assert job.error_message == "SEC rate limit reached; 2 tickers not fetched: GOOG, MSFT"
+
+    def test_fetch_all_task_bounds_concurrent_sec_requests(self, db_session):
+        """Should fetch every ticker in parallel without exceeding the SEC concurrency limit."""
+        job = Job(job_type="fetch", status="pending")
+        db_session.add(job)
+        db_session.commit()
+
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+
+        def fetch_10k(ticker):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.01)
+            with lock:
+                in_flight["now"] -= 1
+            return ticker
+
+        tickers = [{"ticker": f"T{i:03d}"} for i in range(100)]
+        fetcher = MagicMock()
+        fetcher.fetch_company_info.side_effect = lambda t: {"ticker": t, "name": f"{t} Inc.", "cik": t}
+        fetcher.fetch_10k.side_effect = fetch_10k
+        fetcher.extract_sections.side_effect = lambda t: {
+            "risk_factors": "risks", "mda": "mda", "business": "",
+            "accession_number": f"{t}-24-000001", "filing_date": "2024-01-31", "fiscal_year": 2023,
+        }
+        fetcher.get_filing_url.return_value = "https://www.sec.gov/x"
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.SECFetcher", return_value=fetcher), \
+             patch("app.routers.jobs.load_sp100_tickers", return_value=tickers):
+            fetch_all_task(job.id)
+
+        assert db_session.query(Job).filter(Job.id == job.id).one().completed_items == 100
+        assert sorted(c.args[0] for c in fetcher.fetch_10k.call_args_list) == [t["ticker"] for t in tickers]
+        assert 1 < in_flight["peak"] <= SEC_FETCH_CONCURRENCY
+
+    def test_analyze_all_task_saves_results_in_batches(self, db_session, sample_company):
+        """Should analyze every pending filing concurrently across commit batches."""
+        job = Job(job_type="analyze", status="pending")
+        db_session.add(job)
+        for i in range(25):
+            db_session.add(Filing(
+                company_id=sample_company.id,
+                filing_type="10-K",
+                filing_date=date(2024, 1, 1),
+                accession_number=f"0000320193-24-{i:06d}",
+                raw_content={"risk_factors": "risks", "mda": "mda"} if i != 3 else {"risk_factors": ""},
+                status="pending",
+            ))
+        db_session.commit()
+
+        with patch("app.services.gemini_analyzer.genai"):
+            analyzer = GeminiAnalyzer("test-key")
+        analyzer.analyze_async = AsyncMock(return_value={
+            "summary": "Summary",
+            "risk_assessment": {"operational": {"score": 7, "risks": ["Risk"]}},
+        })
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.GeminiAnalyzer", return_value=analyzer), \
+             patch("app.routers.jobs.settings.GEMINI_API_KEY", "test-key"):
+            analyze_all_task(job.id)
+
+        job = db_session.query(Job).filter(Job.id == job.id).one()
+        assert job.status == "completed"
+        assert job.completed_items == 25
+        assert db_session.query(Filing).filter(Filing.status == "completed").count() == 24
+        assert db_session.query(Filing).filter(Filing.status == "error").count() == 1
+        assert db_session.query(AnalysisResult).count() == 24
+        assert {ra.severity for ra in db_session.query(RiskAssessment)} == {"high"}
+        assert analyzer.analyze_async.await_count == 24
+
+    def _add_pending_filings(self, db_session, company, count):
+        """Add an analyze job and count pending filings with analyzable content."""
+        job = Job(job_type="analyze", status="pending")
+        db_session.add(job)
+        db_session.add_all([
+            Filing(
+                company_id=company.id,
+                filing_type="10-K",
+                filing_date=date(2024, 1, 1),
+                accession_number=f"0000320193-24-{i:06d}",
+                raw_content={"risk_factors": "risks", "mda": "mda"},
+                status="pending",
+            )
+            for i in range(count)
+        ])
+        db_session.commit()
+        return job
+
+    def test_analyze_all_task_marks_malformed_result_as_error(self, db_session, sample_company):
+        """Should mark a filing with a malformed Gemini result as error and save the rest."""
+        job = self._add_pending_filings(db_session, sample_company, 3)
+
+        with patch("app.services.gemini_analyzer.genai"):
+            analyzer = GeminiAnalyzer("test-key")
+        analyzer.analyze_batch = AsyncMock(return_value=[
+            {"summary": "Good", "risk_assessment": {"operational": {"score": 7, "risks": []}}},
+            {"summary": "Bad", "risk_assessment": {"operational": 7}},
+            {"summary": "Good", "risk_assessment": {"financial": {"score": 2, "risks": []}}},
+        ])
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.GeminiAnalyzer", return_value=analyzer), \
+             patch("app.routers.jobs.settings.GEMINI_API_KEY", "test-key"):
+            analyze_all_task(job.id)
+
+        job = db_session.query(Job).filter(Job.id == job.id).one()
+        assert job.status == "completed"
+        statuses = [f.status for f in db_session.query(Filing).order_by(Filing.id)]
+        assert statuses == ["completed", "error", "completed"]
+        assert db_session.query(AnalysisResult).count() == 2
+
+    def test_analyze_filings_selects_each_batch_once(self, db_session, sample_company, sql_query_counter):
+        """Should load each batch of filings with one SELECT, with no per-filing reloads."""
+        job_id = self._add_pending_filings(db_session, sample_company, 25).id
+        pending_ids = [filing_id for (filing_id,) in db_session.query(Filing.id).order_by(Filing.id)]
+
+        with patch("app.services.gemini_analyzer.genai"):
+            analyzer = GeminiAnalyzer("test-key")
+        analyzer.analyze_batch = AsyncMock(side_effect=lambda items: [
+            {"summary": "Summary", "risk_assessment": {"operational": {"score": 7, "risks": []}}}
+            for _ in items
+        ])
+
+        sql_query_counter.reset()
+        asyncio.run(_analyze_filings(db_session, job_id, analyzer, RiskCalculator(), pending_ids))
+
+        selects = [s for s in sql_query_counter.statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 2  # 25 filings in batches of 20
+        assert db_session.query(Filing).filter(Filing.status == "completed").count() == 25
+        assert db_session.get(Job, job_id).completed_items == 25
+
+    def test_analyze_all_task_requeues_batch_on_failure(self, db_session, sample_company):
+        """Should put a failed batch back to pending instead of leaving it processing."""
+        job = self._add_pending_filings(db_session, sample_company, 3)
+
+        with patch("app.services.gemini_analyzer.genai"):
+            analyzer = GeminiAnalyzer("test-key")
+        analyzer.analyze_batch = AsyncMock(side_effect=RuntimeError("batch failed"))
+        job_id = job.id
+
+        with patch("app.routers.jobs.SessionLocal", return_value=db_session), \
+             patch("app.routers.jobs.GeminiAnalyzer", return_value=analyzer), \
+             patch("app.routers.jobs.settings.GEMINI_API_KEY", "test-key"):
+            analyze_all_task(job_id)
+
+        job = db_session.query(Job).filter(Job.id == job_id).one()
+        assert job.status == "failed"
+        assert {f.status for f in db_session.query(Filing)} == {"pending"}
+        assert db_session.query(AnalysisResult).count() == 0
@@ -0,0 +1,46 @@
+"""
+Unit tests for database schema helpers.
+"""
+
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base, add_missing_columns, create_indexes
+
+
+class TestAddMissingColumns:
+    """Test suite for add_missing_columns."""
+
+    def test_adds_nullable_columns_to_existing_table(self):
+        """Should add model columns that an older jobs table lacks."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "CREATE TABLE jobs (id INTEGER PRIMARY KEY, job_type VARCHAR(50) NOT NULL, "
+                "status VARCHAR(20), total_items INTEGER, completed_items INTEGER, "
+                "error_message TEXT, started_at DATETIME, completed_at DATETIME, created_at DATETIME)"
+            )
+
+        add_missing_columns(engine)
+
+        columns = {column["name"] for column in inspect(engine).get_columns("jobs")}
+        assert "worker_id" in columns
+        assert not inspect(engine).has_table("companies")
+
+
+class TestCreateIndexes:
+    """Test suite for create_indexes."""
+
+    def test_creates_model_indexes_and_drops_retired_ones(self):
+        """Should add missing model indexes and remove ones the models no longer declare."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_jobs_created")
+            connection.exec_driver_sql("CREATE INDEX ix_jobs_type_status ON jobs (job_type, status)")
+
+        create_indexes(engine)
+
+        indexes = {index["name"] for index in inspect(engine).get_indexes("jobs")}
+        assert "ix_jobs_created" in indexes
+        assert "ix_jobs_one_active" in indexes
+        assert "ix_jobs_type_status" not in indexes
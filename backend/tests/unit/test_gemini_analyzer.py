@@ -2,8 +2,9 @@
 Unit tests for the Gemini Analyzer service.
 """
 
+import asyncio
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import json
 
 from app.services.gemini_analyzer import GeminiAnalyzer
@@ -43,6 +44,74 @@ class TestGeminiAnalyzer:
         assert all(cat in result["risk_assessment"] for cat in
                    ["operational", "financial", "regulatory", "strategic", "reputational"])
 
+    def test_analyze_async_returns_structured_response(self, analyzer, sample_gemini_response):
+        """Should return the same structured result through the async API."""
+        mock_response = Mock()
+        mock_response.text = json.dumps(sample_gemini_response)
+        analyzer.model.generate_content_async = AsyncMock(return_value=mock_response)
+
+        result = asyncio.run(analyzer.analyze_async("Risk factors...", "MD&A..."))
+
+        assert result["summary"] == sample_gemini_response["summary"]
+        assert len(result["risk_assessment"]) == 5
+
+    def test_analyze_async_api_error(self, analyzer):
+        """Should raise ValueError on async API error."""
+        analyzer.model.generate_content_async = AsyncMock(side_effect=Exception("API Error"))
+
+        with pytest.raises(ValueError) as exc_info:
+            asyncio.run(analyzer.analyze_async("Risk factors...", "MD&A..."))
+
+        assert "GEMINI_API_ERROR" in str(exc_info.value)
+
+    def test_analyze_batch_returns_results_in_order(self, analyzer):
+        """Should return each item's analysis or error in input order."""
+        async def fake_analyze(risk_factors, mda):
+            if risk_factors == "bad":
+                raise ValueError("GEMINI_API_ERROR: boom")
+            return {"summary": risk_factors}
+        analyzer.analyze_async = AsyncMock(side_effect=fake_analyze)
+
+        results = asyncio.run(analyzer.analyze_batch([("a", "m"), ("bad", "m"), ("c", "m")]))
+
+        assert results[0] == {"summary": "a"}
+        assert isinstance(results[1], ValueError)
+        assert results[2] == {"summary": "c"}
+
+    def test_analyze_returns_cached_result(self, mock_genai, sample_gemini_response):
+        """Should serve a repeat analysis from the cache without calling Gemini."""
+        cache = Mock()
+        cache.get.return_value = sample_gemini_response
+        analyzer = GeminiAnalyzer("test-api-key", cache=cache)
+        analyzer.model.generate_content = Mock()
+
+        result = analyzer.analyze("Risk factors...", "MD&A...")
+
+        assert result == sample_gemini_response
+        analyzer.model.generate_content.assert_not_called()
+
+    def test_analyze_populates_cache_on_miss(self, mock_genai, sample_gemini_response):
+        """Should store a freshly parsed analysis under the content hash."""
+        cache = Mock()
+        cache.get.return_value = None
+        analyzer = GeminiAnalyzer("test-api-key", cache=cache)
+        mock_response = Mock()
+        mock_response.text = json.dumps(sample_gemini_response)
+        analyzer.model.generate_content = Mock(return_value=mock_response)
+
+        result = analyzer.analyze("Risk factors...", "MD&A...")
+
+        key = analyzer._cache_key("Risk factors...", "MD&A...")
+        cache.get.assert_called_once_with(key)
+        cache.set.assert_called_once_with(key, result, ttl=GeminiAnalyzer.CACHE_TTL)
+
+    def test_cache_key_ignores_text_past_prompt_limit(self, analyzer):
+        """Should key only on the section text that reaches the prompt."""
+        base = analyzer._cache_key("r" * 15000, "m")
+
+        assert analyzer._cache_key("r" * 15000 + "extra", "m") == base
+        assert analyzer._cache_key("r" * 14999, "m") != base
+
     def test_analyze_parses_json_with_markdown(self, analyzer, sample_gemini_response):
         """Should handle Gemini response wrapped in markdown code blocks."""
         # Mock response with markdown
@@ -65,6 +134,17 @@ class TestGeminiAnalyzer:
 
         assert "GEMINI_PARSE_ERROR" in str(exc_info.value)
 
+    def test_analyze_handles_invalid_json_object(self, analyzer):
+        """Should raise a parse error for a broken JSON object."""
+        mock_response = Mock()
+        mock_response.text = '{"summary": broken}'
+        analyzer.model.generate_content = Mock(return_value=mock_response)
+
+        with pytest.raises(ValueError) as exc_info:
+            analyzer.analyze("Risk factors...", "MD&A...")
+
+        assert "GEMINI_PARSE_ERROR" in str(exc_info.value)
+
     def test_analyze_handles_missing_summary(self, analyzer):
         """Should add default summary if missing from response."""
         mock_response = Mock()
@@ -140,3 +220,11 @@ class TestGeminiAnalyzer:
             assert category in default
             assert default[category]["score"] == 5
             assert "risks" in default[category]
+
+    def test_default_risk_assessment_lists_not_shared(self, analyzer):
+        """Should give each category its own risks list."""
+        default = analyzer._default_risk_assessment()
+
+        default["operational"]["risks"].append("Extra")
+
+        assert default["financial"]["risks"] == ["Unable to assess"]
@@ -0,0 +1,55 @@
+"""
+Unit tests for the job worker.
+"""
+
+import threading
+
+from app.services.job_worker import JobWorker
+
+
+class TestJobWorker:
+    """Test suite for JobWorker class."""
+
+    def test_submit_runs_job_on_worker_thread(self):
+        """Should run submitted jobs off the calling thread."""
+        worker = JobWorker()
+        done = threading.Event()
+        seen = {}
+
+        def job(value):
+            seen["value"] = value
+            seen["thread"] = threading.current_thread().name
+            done.set()
+
+        worker.submit(job, 42)
+
+        assert done.wait(5)
+        assert seen["value"] == 42
+        assert seen["thread"].startswith("job-worker")
+        worker.shutdown()
+
+    def test_worker_survives_failing_job(self):
+        """Should keep running jobs after one raises."""
+        worker = JobWorker(threads=1)
+        done = threading.Event()
+
+        def failing_job():
+            raise RuntimeError("boom")
+
+        worker.submit(failing_job)
+        worker.submit(done.set)
+
+        assert done.wait(5)
+        worker.shutdown()
+
+    def test_submit_after_shutdown_restarts_threads(self):
+        """Should start fresh threads for jobs submitted after a shutdown."""
+        worker = JobWorker()
+        worker.submit(lambda: None)
+        worker.shutdown()
+        done = threading.Event()
+
+        worker.submit(done.set)
+
+        assert done.wait(5)
+        worker.shutdown()
@@ -0,0 +1,47 @@
+"""
+Unit tests for the LLM response cache.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import LLMCacheEntry
+from app.services.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    """Test suite for LLMResponseCache class."""
+
+    @pytest.fixture
+    def cache(self, db_session):
+        """Create a cache backed by the test session."""
+        return LLMResponseCache(lambda: db_session)
+
+    def test_get_missing_key_returns_none(self, cache):
+        """Should return None for a key that was never stored."""
+        assert cache.get("missing") is None
+
+    def test_set_then_get_round_trip(self, cache):
+        """Should return the stored response for its key."""
+        cache.set("abc", {"summary": "cached"}, ttl=60)
+
+        assert cache.get("abc") == {"summary": "cached"}
+
+    def test_set_replaces_existing_entry(self, cache):
+        """Should overwrite an entry stored under the same key."""
+        cache.set("abc", {"summary": "old"}, ttl=60)
+        cache.set("abc", {"summary": "new"}, ttl=60)
+
+        assert cache.get("abc") == {"summary": "new"}
+
+    def test_expired_entry_is_ignored(self, cache, db_session):
+        """Should treat entries past their expiry as missing."""
+        db_session.add(LLMCacheEntry(
+            input_hash="old",
+            response_json={"summary": "stale"},
+            expires_at=datetime.utcnow() - timedelta(seconds=1)
+        ))
+        db_session.commit()
+
+        assert cache.get("old") is None
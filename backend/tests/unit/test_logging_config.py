@@ -0,0 +1,38 @@
+"""
+Unit tests for the structured log writer.
+"""
+
+import threading
+
+import orjson
+
+from app.logging_config import _LogWriter
+
+
+class TestLogWriter:
+    """Test suite for _LogWriter class."""
+
+    def test_close_keeps_entries_logged_during_shutdown(self, tmp_path):
+        """Should write every entry, including ones logged while close() runs."""
+        writer = _LogWriter(tmp_path / "app.jsonl")
+        stop = threading.Event()
+        logged = []
+
+        def log_until_stopped():
+            i = 0
+            while not stop.is_set() or i < 100:
+                writer.put({"n": i})
+                logged.append(i)
+                i += 1
+
+        logger_thread = threading.Thread(target=log_until_stopped)
+        logger_thread.start()
+        writer.close()
+        stop.set()
+        logger_thread.join()
+        writer.put({"n": "after"})
+
+        lines = (tmp_path / "app.jsonl").read_bytes().splitlines()
+        written = [orjson.loads(line)["n"] for line in lines]
+        assert sorted(n for n in written if n != "after") == logged
+        assert written[-1] == "after"
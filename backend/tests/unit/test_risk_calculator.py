@@ -18,6 +18,7 @@ class TestRiskCalculator:
         """Should have all 5 risk categories defined."""
         expected_categories = ["operational", "financial", "regulatory", "strategic", "reputational"]
         assert calculator.RISK_CATEGORIES == expected_categories
+        assert calculator.RISK_CATEGORY_SET == frozenset(expected_categories)
 
     def test_calculate_overall_average(self, calculator):
         """Should calculate correct weighted average of scores."""
@@ -101,6 +102,38 @@ class TestRiskCalculatorDatabaseOperations:
         scores = calculator.get_company_risk_scores(db_session, sample_company.id)
         assert scores is None
 
+    def test_get_company_risk_scores_cached(self, calculator, db_session, sample_analysis, sample_company):
+        """Should serve repeat lookups for the same latest filing from cache."""
+        first = calculator.get_company_risk_scores(db_session, sample_company.id)
+
+        # Changing stored scores is not visible until a new filing is analyzed
+        for ra in sample_analysis.filing.risk_assessments:
+            ra.score = 10
+        db_session.commit()
+
+        assert calculator.get_company_risk_scores(db_session, sample_company.id) == first
+        assert calculator.get_company_risk_scores_bulk(db_session, [sample_company.id]) == {
+            sample_company.id: first
+        }
+
+        calculator.clear_cache()
+        assert calculator.get_company_risk_scores(db_session, sample_company.id)["operational"] == 10
+
+    def test_get_company_risk_scores_bulk(self, calculator, db_session, sample_analysis, sample_company):
+        """Should return the same scores as the per-company lookup, keyed by company id."""
+        from app.models import Company
+
+        other = Company(ticker="MSFT", name="Microsoft Corporation", cik="0000789019")
+        db_session.add(other)
+        db_session.commit()
+
+        scores = calculator.get_company_risk_scores_bulk(db_session, [sample_company.id, other.id])
+
+        assert scores == {
+            sample_company.id: calculator.get_company_risk_scores(db_session, sample_company.id)
+        }
+        assert calculator.get_company_risk_scores_bulk(db_session, []) == {}
+
     def test_get_risk_summary_empty_db(self, calculator, db_session):
         """Should return zeros for empty database."""
         summary = calculator.get_risk_summary(db_session)
@@ -119,3 +152,37 @@ class TestRiskCalculatorDatabaseOperations:
         assert summary["analyzed_companies"] == 1
         # The sample analysis has medium overall score (avg of 5,4,6,3,4 = 4.4)
         assert summary["medium_risk_count"] == 1 or summary["low_risk_count"] == 1
+
+    def test_get_risk_summary_severity_buckets(self, calculator, db_session, sample_company):
+        """Should bucket per-filing overall scores the way get_severity(round()) does."""
+        from datetime import date
+        from app.models import Filing, RiskAssessment
+
+        # Overall scores 7.0 (high), 6.5 (medium), 3.5 (medium) and 3.0 (low)
+        for i, scores in enumerate([(7, 7), (6, 7), (3, 4), (3, 3)]):
+            filing = Filing(
+                company_id=sample_company.id,
+                filing_type="10-K",
+                filing_date=date(2020 + i, 1, 1),
+                accession_number=f"0000320193-{i:02d}-000001",
+                status="completed",
+            )
+            db_session.add(filing)
+            db_session.flush()
+            for category, score in zip(["operational", "financial"], scores):
+                db_session.add(RiskAssessment(
+                    filing_id=filing.id, category=category, score=score,
+                    severity=calculator.get_severity(score),
+                ))
+        db_session.commit()
+
+        summary = calculator.get_risk_summary(db_session)
+
+        assert summary["high_risk_count"] == 1
+        assert summary["medium_risk_count"] == 2
+        assert summary["low_risk_count"] == 1
+        assert summary["average_risk_score"] == 5.0
+        assert summary["risk_by_category"] == {
+            "operational": 4.8, "financial": 5.2, "regulatory": None,
+            "strategic": None, "reputational": None,
+        }
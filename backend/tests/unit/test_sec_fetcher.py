@@ -2,6 +2,7 @@
 Unit tests for the SEC Fetcher service.
 """
 
+import httpx
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 
@@ -13,10 +14,13 @@ class TestSECFetcher:
     def mock_edgar(self):
         """Mock the edgar module."""
         with patch('app.services.sec_fetcher.Company') as mock_company, \
-             patch('app.services.sec_fetcher.set_identity') as mock_identity:
+             patch('app.services.sec_fetcher.set_identity') as mock_identity, \
+             patch('app.services.sec_fetcher.get_company_tickers') as mock_tickers:
+            mock_tickers.return_value = {"ticker": [], "cik": [], "company": []}
             yield {
                 'Company': mock_company,
-                'set_identity': mock_identity
+                'set_identity': mock_identity,
+                'get_company_tickers': mock_tickers
             }
 
     @pytest.fixture
@@ -31,6 +35,32 @@ class TestSECFetcher:
         fetcher = SECFetcher("TestApp test@example.com")
         mock_edgar['set_identity'].assert_called_once_with("TestApp test@example.com")
 
+    def test_initialization_sizes_http_pool(self, mock_edgar):
+        """Should size edgartools' shared keep-alive pool and enable HTTP/2 when available."""
+        from edgar.httpclient import HTTP_MGR
+        from app.services.sec_fetcher import SECFetcher, HTTP_POOL_SIZE, HTTP2_AVAILABLE
+        SECFetcher("TestApp test@example.com")
+        limits = HTTP_MGR.httpx_params["limits"]
+        assert limits.max_connections == HTTP_POOL_SIZE
+        assert limits.max_keepalive_connections == HTTP_POOL_SIZE
+        assert HTTP_MGR.httpx_params["http2"] is HTTP2_AVAILABLE
+        # The pool lives in the transport, so the limits must reach it too
+        transport_params = HTTP_MGR._get_httpx_transport_params(HTTP_MGR.httpx_params)
+        assert transport_params["limits"] is limits
+        assert transport_params["http2"] is HTTP2_AVAILABLE
+
+    def test_configure_http_pool_tolerates_missing_internals(self):
+        """Should leave edgartools alone when its HTTP manager lacks the expected internals."""
+        from app.services.sec_fetcher import configure_http_pool, HTTP_POOL_SIZE
+
+        with patch('edgar.httpclient.HTTP_MGR', object()):
+            configure_http_pool()
+
+        bare_manager = Mock(spec=["httpx_params"], httpx_params={})
+        with patch('edgar.httpclient.HTTP_MGR', bare_manager):
+            configure_http_pool()
+        assert bare_manager.httpx_params["limits"].max_connections == HTTP_POOL_SIZE
+
     def test_fetch_company_info_success(self, fetcher, mock_edgar):
         """Should return company info for valid ticker."""
         mock_company = Mock()
@@ -46,6 +76,19 @@ class TestSECFetcher:
         assert result["name"] == "Apple Inc."
         assert result["cik"] == "0000320193"
 
+    def test_fetch_company_info_from_ticker_map(self, mock_edgar):
+        """Should resolve known tickers from the SEC ticker map without a live lookup."""
+        from app.services.sec_fetcher import SECFetcher
+        mock_edgar['get_company_tickers'].return_value = {
+            "ticker": ["AAPL"], "cik": [320193], "company": ["Apple Inc."]
+        }
+        fetcher = SECFetcher("TestApp test@example.com")
+
+        result = fetcher.fetch_company_info("aapl")
+
+        assert result == {"ticker": "AAPL", "name": "Apple Inc.", "cik": "0000320193", "sector": None}
+        mock_edgar['Company'].assert_not_called()
+
     def test_fetch_company_info_error(self, fetcher, mock_edgar):
         """Should return None on error."""
         mock_edgar['Company'].side_effect = Exception("API Error")
@@ -102,6 +145,65 @@ class TestSECFetcher:
 
         assert result is None
 
+    def test_fetch_10k_backs_off_after_rate_limit(self, fetcher, mock_edgar):
+        """Should skip live lookups until the Retry-After window has passed."""
+        rate_limited = Exception("429 Rate limit exceeded")
+        rate_limited.retry_after = 30
+        mock_edgar['Company'].side_effect = [rate_limited, Mock()]
+
+        with patch('app.services.sec_fetcher.time.monotonic', return_value=1000.0):
+            assert fetcher.fetch_10k("AAPL") is None
+            assert fetcher.fetch_10k("MSFT") is None
+            assert fetcher.fetch_company_info("NEWCO") is None
+        assert mock_edgar['Company'].call_count == 1
+        assert fetcher.rate_limited_tickers == {"AAPL", "MSFT", "NEWCO"}
+
+        with patch('app.services.sec_fetcher.time.monotonic', return_value=1031.0):
+            fetcher.fetch_10k("MSFT")
+        assert mock_edgar['Company'].call_count == 2
+
+    def test_fetch_10k_cached_by_ticker(self, fetcher, mock_edgar):
+        """Should reuse a fetched 10-K for repeat lookups of the same ticker."""
+        mock_filing = Mock(accession_number="0000320193-24-000123")
+        mock_company = Mock()
+        mock_company.get_filings.return_value.latest.return_value = [mock_filing]
+        mock_edgar['Company'].return_value = mock_company
+
+        assert fetcher.fetch_10k("AAPL") is mock_filing
+        assert fetcher.fetch_10k("aapl") is mock_filing
+        assert mock_edgar['Company'].call_count == 1
+
+    def test_fetch_10k_failure_not_cached(self, fetcher, mock_edgar):
+        """Should retry a lookup that failed instead of caching the miss."""
+        mock_edgar['Company'].side_effect = [Exception("Connection error"), Mock()]
+
+        assert fetcher.fetch_10k("AAPL") is None
+        fetcher.fetch_10k("AAPL")
+
+        assert mock_edgar['Company'].call_count == 2
+
+    def test_rate_limit_detected_from_status_code(self):
+        """Should classify HTTP 429 responses as rate limited by status code."""
+        from app.services.sec_fetcher import _is_rate_limited
+
+        request = httpx.Request("GET", "https://data.sec.gov/submissions/CIK0000320193.json")
+        too_many = httpx.HTTPStatusError("", request=request, response=httpx.Response(429, request=request))
+        not_found = httpx.HTTPStatusError("", request=request, response=httpx.Response(404, request=request))
+
+        assert _is_rate_limited(too_many)
+        assert not _is_rate_limited(not_found)
+
+    def test_rate_limit_detected_from_edgar_error_and_message(self):
+        """Should match edgartools' 429 error and whole-word messages, not words containing "rate"."""
+        from edgar.httprequests import TooManyRequestsError
+        from app.services.sec_fetcher import _is_rate_limited
+
+        assert _is_rate_limited(TooManyRequestsError("https://data.sec.gov/x", retry_after=5))
+        assert _is_rate_limited(Exception("Rate limit exceeded"))
+        assert _is_rate_limited(Exception("HTTP 429 Too Many Requests"))
+        assert not _is_rate_limited(Exception("Failed to generate corporate filing index"))
+        assert not _is_rate_limited(Exception("Accession 0000320193-24-004291 not found"))
+
     def test_extract_sections_success(self, fetcher):
         """Should extract key sections from filing."""
         mock_tenk = Mock()
@@ -74,7 +74,9 @@ export interface RiskSummary {
 
 export interface CompanyListResponse {
   companies: Company[];
-  total: number;
+  total: number | null;
+  has_more: boolean;
+  next_cursor: string | null;
 }
 
 // API Functions
@@ -96,11 +98,12 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
 
 // Companies API
 export const companiesApi = {
-  list: (params?: { skip?: number; limit?: number; sector?: string }) => {
+  list: (params?: { skip?: number; limit?: number; sector?: string; cursor?: string }) => {
     const searchParams = new URLSearchParams();
     if (params?.skip) searchParams.set('skip', String(params.skip));
     if (params?.limit) searchParams.set('limit', String(params.limit));
     if (params?.sector) searchParams.set('sector', params.sector);
+    if (params?.cursor) searchParams.set('cursor', params.cursor);
     const query = searchParams.toString();
     return fetchApi<CompanyListResponse>(`/companies${query ? `?${query}` : ''}`);
   },